@@ -0,0 +1,76 @@
+"""
+Peak memory and time of converting a freshly parsed JSON payload, by the
+constructor (`gdict(data)`, a converted copy of the whole payload) and by
+`gdict.adopt(data)` (in place, the lists are kept and each dict is moved into
+a gdict and cleared at once).
+
+The memory is traced by `tracemalloc` (Python 3.9+), the peak and the
+retained (what remains after the plain payload is dropped) are above the
+parsed payload. The times are taken with the tracing on, slower than usual.
+
+    $ python benchmarks/adopt.py
+    $ python benchmarks/adopt.py --records 100000
+"""
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, __file__.rsplit('/', 2)[0])
+
+import gqylpy_dict as gdict
+
+
+def payload(records):
+    return json.dumps({'records': [
+        {
+            'id': i, 'name': f'user{i}', 'tags': ['a', 'b', 'c'],
+            'address': {'city': 'x', 'geo': {'lat': i / 3, 'lng': -i / 3}},
+            'orders': [{'sku': f's{j}', 'qty': j} for j in range(3)]
+        }
+        for i in range(records)
+    ]})
+
+
+def measure(convert, text):
+    # Traced from the parsing, so that the payload freed is accounted.
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    result = convert(data)
+    elapsed = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    del data
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert result.records[-1].orders[-1].qty == 2
+    return peak - base, retained - base, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=20000)
+    args = parser.parse_args()
+
+    text = payload(args.records)
+    print(f'{args.records} records, {len(text) / 2 ** 20:.1f} MiB of JSON')
+
+    for name, convert in (('gdict(data)', gdict), ('adopt(data)', gdict.adopt)):
+        peak, retained, elapsed = measure(convert, text)
+        print(
+            f'{name:>12}: peak +{peak / 2 ** 20:7.1f} MiB, '
+            f'retained +{retained / 2 ** 20:7.1f} MiB, {elapsed:.3f} s'
+        )
+
+
+if __name__ == '__main__':
+    main()
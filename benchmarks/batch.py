@@ -0,0 +1,101 @@
+"""
+Memory per record of a list of same-shaped records: the parsed dicts, the
+gdict nodes (`gdict(records)`) and the batch records (`gdict.batch(records)`,
+one key layout shared by the records, the values in a list per record). Also
+the time to build them and to read a field, a nested field and a deep key.
+
+The memory is traced by `tracemalloc` (Python 3.9+), it is what is retained
+by the records once the parsed payload is dropped. Most of the values are
+small ints (shared by the interpreter), so that the difference is the
+containers. The build is timed without the tracing.
+
+    $ python benchmarks/batch.py
+    $ python benchmarks/batch.py --records 1000000 --keys 20
+"""
+import sys
+import gc
+import json
+import time
+import timeit
+import argparse
+import tracemalloc
+
+sys.path.insert(0, __file__.rsplit('/', 2)[0])
+
+import gqylpy_dict as gdict
+
+
+def payload(records, keys):
+    return json.dumps([
+        {
+            'id': i,
+            'user': {'name': f'user{i}', 'country': 'NL'},
+            **{f'field{j}': (i + j) % 100 for j in range(keys - 2)}
+        }
+        for i in range(records)
+    ])
+
+
+def measure(build, text):
+    data = json.loads(text)
+    gc.collect()
+    start = time.perf_counter()
+    build(data)
+    elapsed = time.perf_counter() - start
+    del data
+
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    result = build(data)
+    del data
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def per_call(function):
+    # In microseconds.
+    return min(timeit.repeat(function, number=100000, repeat=3)) * 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=200000)
+    parser.add_argument('--keys', type=int, default=20)
+    args = parser.parse_args()
+
+    text = payload(args.records, args.keys)
+    print(f'{args.records} records of {args.keys} keys (one nested)')
+
+    for name, build in (
+            ('dict', lambda data: data),
+            ('gdict', gdict),
+            ('batch', gdict.batch)
+    ):
+        records, retained, elapsed = measure(build, text)
+        record = records[args.records // 2]
+        assert record['user']['country'] == 'NL'
+
+        if name == 'dict':
+            getattr_ = lambda: record['field1']
+            nested = lambda: record['user']['name']
+        else:
+            getattr_ = lambda: record.field1
+            nested = lambda: record.user.name
+            deepget = lambda: record.deepget('user.name')
+
+        row = (
+            f'{name:>6}: {retained / args.records:7.1f} bytes/record, '
+            f'build {elapsed:6.3f} s, field {per_call(getattr_):5.2f} us, '
+            f'nested {per_call(nested):5.2f} us'
+        )
+        if name != 'dict':
+            row += f', deepget {per_call(deepget):5.2f} us'
+        print(row)
+        del records, record
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Stress test and throughput benchmark of `gdict.concurrent` under threads.
+
+The stress test runs the threads racing to create the same top-level keys by
+`deepset` and `deepsetdefault`, and checks that no write is lost and that each
+`deepsetdefault` has a single winner. The plain gdict is run for comparison,
+it is expected to lose some (not every time, the races are timing-dependent).
+
+The benchmark compares the throughput of deep writes of the plain gdict (not
+thread-safe), a single lock (`stripes=1`) and the lock striping. The threads
+only run in parallel on a free-threaded build of CPython (3.13+).
+
+    $ python benchmarks/concurrent_writes.py
+"""
+import sys
+import time
+import random
+import threading
+
+sys.path.insert(0, __file__.rsplit('/', 2)[0])
+
+import gqylpy_dict as gdict
+
+
+def run_threads(target, count):
+    barrier = threading.Barrier(count)
+
+    def run(t):
+        barrier.wait()
+        target(t)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def stress(factory, threads=8, rounds=3000):
+    x = factory()
+    winners = [[None] * threads for _ in range(rounds)]
+
+    def worker(t):
+        for i in range(rounds):
+            x.deepset(f'r{i}.t{t}.v', i)
+            winners[i][t] = x.deepsetdefault(f'o{i}.owner', t)
+
+    run_threads(worker, threads)
+
+    lost = sum(
+        x.deepget(f'r{i}.t{t}.v') != i
+        for i in range(rounds) for t in range(threads)
+    )
+    split = sum(len(set(owners)) > 1 for owners in winners)
+    return lost, split
+
+
+def throughput(factory, threads, ops=20000, keys=64):
+    x = factory()
+    paths = [
+        [f'k{random.randrange(keys)}.t{t}.v{i % 8}' for i in range(ops)]
+        for t in range(threads)
+    ]
+
+    def worker(t):
+        deepset = x.deepset
+        for path in paths[t]:
+            deepset(path, 1)
+
+    start = time.perf_counter()
+    run_threads(worker, threads)
+    return threads * ops / (time.perf_counter() - start)
+
+
+def main():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often to provoke the races.
+    try:
+        for name, factory in (
+                ('gdict', gdict),
+                ('concurrent', gdict.concurrent)
+        ):
+            lost, split = stress(factory)
+            print(
+                f'stress {name:>10}: {lost} writes lost, '
+                f'{split} deepsetdefault with several winners'
+            )
+            if name == 'concurrent':
+                assert lost == split == 0
+    finally:
+        sys.setswitchinterval(interval)
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'\nthroughput (deepset/s), GIL {"enabled" if gil else "disabled"}:')
+    for threads in (1, 2, 4, 8):
+        results = [
+            throughput(factory, threads) for factory in (
+                gdict,
+                lambda: gdict.concurrent(stripes=1),
+                gdict.concurrent
+            )
+        ]
+        print(
+            f'{threads} threads: gdict (unsafe) {results[0]:>10.0f}, '
+            f'single lock {results[1]:>10.0f}, '
+            f'striped {results[2]:>10.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
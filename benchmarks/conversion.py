@@ -0,0 +1,93 @@
+"""
+Benchmark the conversion of `gdict(data)` against the previous recursive
+conversion (`GqylpyDict(value)` called for each value), per node.
+
+    $ python benchmarks/conversion.py
+"""
+import sys
+import timeit
+
+sys.path.insert(0, __file__.rsplit('/', 2)[0])
+
+import gqylpy_dict as gdict
+
+
+class LegacyDict(dict):
+
+    def __init__(self, __data__=None, /, **data):
+        if __data__ is None:
+            __data__ = data
+        else:
+            __data__.update(data)
+
+        for name, value in __data__.items():
+            dict.__setitem__(self, name, LegacyDict(value))
+
+    def __new__(cls, __data__={}, /, **data):
+        if isinstance(__data__, dict):
+            return dict.__new__(cls)
+
+        if isinstance(__data__, (list, tuple)):
+            return __data__.__class__(cls(v) for v in __data__)
+
+        return __data__
+
+
+def count_nodes(data):
+    count, stack = 0, [data]
+    while stack:
+        data = stack.pop()
+        count += 1
+        if isinstance(data, dict):
+            stack.extend(data.values())
+        elif isinstance(data, (list, tuple)):
+            stack.extend(data)
+    return count
+
+
+def dict_heavy(width, depth):
+    if depth == 0:
+        return {f'k{i}': i for i in range(width)}
+    return {f'k{i}': dict_heavy(width, depth - 1) for i in range(width)}
+
+
+def list_heavy(length):
+    return {'items': [
+        {'id': i, 'tags': ['a', 'b'], 'pos': (i, i)} for i in range(length)
+    ]}
+
+
+def deep(depth):
+    data = node = {}
+    for i in range(depth):
+        node['next'] = node = {'i': i}
+    return data
+
+
+def bench(name, data, number=5):
+    nodes = count_nodes(data)
+    legacy = min(timeit.repeat(lambda: LegacyDict(data), number=number))
+    current = min(timeit.repeat(lambda: gdict(data), number=number))
+    print(
+        f'{name:>12} {nodes:>8} nodes: '
+        f'legacy {legacy / number / nodes * 1e9:7.1f} ns/node, '
+        f'current {current / number / nodes * 1e9:7.1f} ns/node'
+    )
+
+
+def main():
+    bench('dict-heavy', dict_heavy(10, 4))
+    bench('list-heavy', list_heavy(20000))
+    bench('deep-300', deep(300))
+
+    data = deep(100000)
+    try:
+        LegacyDict(data)
+    except RecursionError:
+        print('legacy: RecursionError at depth 100000')
+    gdict(data)
+    print('current: converted depth 100000')
+
+
+if __name__ == '__main__':
+    main()
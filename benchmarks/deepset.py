@@ -0,0 +1,159 @@
+"""
+Benchmark `deepset` and `deepsetdefault` against the previous implementation,
+which re-joins and re-walks the prefix of the deep key on each layer.
+
+    $ python benchmarks/deepset.py
+"""
+import re
+import sys
+import timeit
+
+sys.path.insert(0, __file__.rsplit('/', 2)[0])
+
+import gqylpy_dict as gdict
+
+__unique__ = object()
+
+
+def legacy_deepget(self, deepkey, default=None):
+    deepkey = deepkey[:-1] if deepkey and deepkey[-1] == ']' else deepkey
+    value = self
+
+    for key in re.split(r'\.|\[|][.\[]', deepkey):
+        if isinstance(value, (list, tuple)):
+            try:
+                key = int(key)
+            except ValueError:
+                return default
+        try:
+            value = value[key]
+        except KeyError:
+            try:
+                if key.isdigit() or key[0] == '-' and key[1:].isdigit():
+                    value = value[int(key)]
+                elif key == 'None':
+                    value = value[None]
+                elif key == 'True':
+                    value = value[True]
+                elif key == 'False':
+                    value = value[False]
+                elif key == 'Ellipsis':
+                    value = value[...]
+                else:
+                    return default
+            except (KeyError, IndexError):
+                return default
+        except (IndexError, TypeError):
+            return default
+
+    return value
+
+
+def legacy_int_key(key):
+    try:
+        return int(key[:-1])
+    except ValueError:
+        return key
+
+
+def legacy_set_next_data(data, key, value):
+    try:
+        data[key] = value
+    except IndexError:
+        if key in (0, -1):
+            data.append(value)
+        elif key > 0:
+            for _ in range(key - len(data)):
+                data.append(None)
+            data.append(value)
+        else:
+            for _ in range(abs(key) - len(data) - 1):
+                data.append(None)
+            data.insert(0, value)
+    return data[key]
+
+
+def legacy_deepset(self, deepkey, value):
+    existing_keys, nonexistent_keys = re.split(r'[.\[]', deepkey), []
+    last_key = legacy_int_key(existing_keys.pop())
+
+    while existing_keys:
+        data = legacy_deepget(self, '.'.join(existing_keys), __unique__)
+        key = legacy_int_key(existing_keys.pop())
+
+        if data is not __unique__:
+            try:
+                next_key = nonexistent_keys[0]
+            except IndexError:
+                next_key = last_key
+            if (
+                    next_key.__class__ is str and not isinstance(data, dict)
+                                              or
+                    next_key.__class__ is int and data.__class__ is not list
+            ):
+                data = legacy_deepget(self, '.'.join(existing_keys)) \
+                    if existing_keys else self
+                nonexistent_keys.insert(0, key)
+            break
+        nonexistent_keys.insert(0, key)
+    else:
+        data = self
+
+    for i, key in enumerate(nonexistent_keys):
+        try:
+            next_key = nonexistent_keys[i + 1]
+        except IndexError:
+            next_key = last_key
+        next_data = gdict() if next_key.__class__ is str else []
+        data = legacy_set_next_data(data, key, next_data)
+    legacy_set_next_data(data, last_key, value)
+
+
+def legacy_deepsetdefault(self, deepkey, default):
+    value = legacy_deepget(self, deepkey, __unique__)
+    if value is __unique__:
+        legacy_deepset(self, deepkey, default)
+        return default
+    return value
+
+
+def make_deepkey(depth):
+    return '.'.join(
+        f'k{i}[0]' if i % 4 == 3 else f'k{i}' for i in range(depth)
+    )
+
+
+def bench(name, stmt, number):
+    seconds = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    return f'{name:>10}: {seconds * 1e6:10.2f} us'
+
+
+def main():
+    for depth in 5, 20, 100:
+        deepkey = make_deepkey(depth)
+        number = 20000 // depth
+
+        existing = gdict()
+        existing.deepset(deepkey, 0)
+
+        print(f'depth={depth} deepkey={deepkey[:40]}...')
+
+        print('  overwrite an existing leaf')
+        print(bench('legacy', lambda: legacy_deepset(
+            existing, deepkey, 1), number))
+        print(bench('current', lambda: existing.deepset(deepkey, 1), number))
+
+        print('  create the whole path')
+        print(bench('legacy', lambda: legacy_deepset(
+            gdict(), deepkey, 1), number))
+        print(bench('current', lambda: gdict().deepset(deepkey, 1), number))
+
+        print('  deepsetdefault on an existing leaf')
+        print(bench('legacy', lambda: legacy_deepsetdefault(
+            existing, deepkey, 1), number))
+        print(bench('current', lambda: existing.deepsetdefault(
+            deepkey, 1), number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark `deepupdate` against the convert-then-update path it replaces: the
+overlay is converted to a gdict (`gdict(overlay)`) and then merged by a
+recursive merge on top of it. `update` (shallow, the nested sections are
+replaced instead of merged) is shown for reference.
+
+The base is a config of sections, the overlay changes a few leaves in some of
+the sections and adds a few new subtrees. Each update runs on a fresh copy of
+the base, the copies are made before the timing.
+
+    $ python benchmarks/deepupdate.py
+    $ python benchmarks/deepupdate.py --sections 10000 --touched 0.1
+"""
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, __file__.rsplit('/', 2)[0])
+
+import gqylpy_dict as gdict
+
+
+def make_base(sections):
+    return {
+        f'section{i}': {
+            'enabled': True,
+            'limits': {'cpu': i % 8, 'memory': f'{i % 64}Mi'},
+            'hosts': [f'h{i}-{j}' for j in range(4)],
+            'options': {f'opt{j}': {'value': j, 'tags': ['a', 'b']}
+                        for j in range(8)}
+        }
+        for i in range(sections)
+    }
+
+
+def make_overlay(sections, touched, seed=0):
+    rng = random.Random(seed)
+    overlay = {}
+    for i in rng.sample(range(sections), int(sections * touched)):
+        overlay[f'section{i}'] = {
+            'limits': {'cpu': 16},
+            'options': {'opt3': {'value': -1}},
+            'extra': {'added': [{'k': 1}, {'k': 2}]}
+        }
+    return overlay
+
+
+def merge(target, source):
+    # The recursive merge written on top of the converted overlay.
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def convert_then_merge(base, overlay):
+    merge(base, gdict(overlay))
+
+
+def bench(update, bases, overlay):
+    start = time.perf_counter()
+    for base in bases:
+        update(base, overlay)
+    return (time.perf_counter() - start) / len(bases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sections', type=int, default=2000)
+    parser.add_argument('--touched', type=float, default=0.05)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    base = gdict(make_base(args.sections))
+    overlay = make_overlay(args.sections, args.touched)
+    print(
+        f'{args.sections} sections, {len(overlay)} touched by the overlay'
+    )
+
+    expected = base.deepcopy()
+    convert_then_merge(expected, overlay)
+    merged = base.deepcopy()
+    merged.deepupdate(overlay)
+    assert merged == expected
+
+    for name, update in (
+            ('update (shallow)', lambda x, o: x.update(o)),
+            ('convert + merge', convert_then_merge),
+            ('deepupdate', lambda x, o: x.deepupdate(o))
+    ):
+        bases = [base.deepcopy() for _ in range(args.rounds)]
+        seconds = bench(update, bases, overlay)
+        print(f'{name:>16}: {seconds * 1e3:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Benchmark suite of gdict against the built-in dict, across the document sizes
+(in nodes), the shapes (dict-heavy of different depths, list-heavy) and the
+operations below. The results can be written as JSON and compared with the
+results of another release.
+
+    $ python benchmarks/suite.py                        # 10 to 1M nodes
+    $ python benchmarks/suite.py --quick                # 10 to 10k nodes
+    $ python benchmarks/suite.py --json after.json --compare before.json
+
+The operations, and what the dict side of each one is:
+
+    init          gdict(data)              copy.deepcopy(data)
+    getattr       x.k0.k0                  x['k0']['k0']
+    setitem       x['new'] = {...}         the same
+    deepget       x.deepget('k0.k0')       a loop of __getitem__
+    deepset       x.deepset('k0.k0', 1)    a loop of __getitem__, __setitem__
+    deepcontain   x.deepcontain('k0.k0')   a loop of __getitem__
+    update        x.update({...})          the same
+    copy          x.copy()                 the same
+    deepcopy      x.deepcopy()             copy.deepcopy(x)
+    pickle        loads(dumps(x))          the same
+
+The time is the best of the repeats, in nanoseconds per operation.
+"""
+import sys
+import copy
+import json
+import time
+import pickle
+import timeit
+import argparse
+import platform
+
+sys.path.insert(0, __file__.rsplit('/', 2)[0])
+
+import gqylpy_dict as gdict
+
+DEFAULT_SIZES = (10, 1000, 100000, 1000000)
+QUICK_SIZES = (10, 1000, 10000)
+
+# (shape, depth), the depth of a list-heavy document is fixed.
+SHAPES = (('dict-heavy', 2), ('dict-heavy', 6), ('list-heavy', 3))
+
+
+def count_nodes(data):
+    count, stack = 0, [data]
+    while stack:
+        data = stack.pop()
+        count += 1
+        if isinstance(data, dict):
+            stack.extend(data.values())
+        elif isinstance(data, (list, tuple)):
+            stack.extend(data)
+    return count
+
+
+def dict_heavy(size, depth):
+    width = max(2, round(size ** (1 / depth)))
+    data = {f'k{i}': i for i in range(width)}
+    for _ in range(depth - 1):
+        data = {f'k{i}': copy.deepcopy(data) for i in range(width)}
+    return data, ['k0'] * depth
+
+
+def list_heavy(size):
+    # 8 nodes per record.
+    length = max(1, size // 8)
+    data = {'records': [
+        {'id': i, 'tags': ['a', 'b'], 'pos': {'x': i, 'y': i}}
+        for i in range(length)
+    ]}
+    return data, ['records', length // 2, 'pos', 'y']
+
+
+def make_document(shape, size, depth):
+    if shape == 'dict-heavy':
+        return dict_heavy(size, depth)
+    return list_heavy(size)
+
+
+def deepkey_of(path):
+    deepkey = ''
+    for key in path:
+        deepkey += f'[{key}]' if key.__class__ is int else f'.{key}'
+    return deepkey.lstrip('.')
+
+
+def getter_of(path, attr):
+    expr = ''.join(
+        f'[{key}]' if key.__class__ is int else
+        f'.{key}' if attr else f'[{key!r}]'
+        for key in path
+    )
+    return eval(f'lambda x: x{expr}')
+
+
+def dict_deepget(data, path, default=None):
+    for key in path:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+    return data
+
+
+def dict_deepset(data, path, value):
+    for key in path[:-1]:
+        data = data[key]
+    data[path[-1]] = value
+
+
+def operations(data, path):
+    """Return {operation: (gdict function, dict function)}."""
+    x = gdict(data)
+    deepkey = deepkey_of(path)
+    attr_get, item_get = getter_of(path, True), getter_of(path, False)
+    new = {'a': {'b': [1, 2, {'c': 3}]}}
+    other = {f'u{i}': {'a': i} for i in range(10)}
+
+    def dict_setitem():
+        data['bench'] = new
+
+    def gdict_setitem():
+        x['bench'] = new
+
+    return {
+        'init': (
+            lambda: gdict(data),
+            lambda: copy.deepcopy(data)
+        ),
+        'getattr': (
+            lambda: attr_get(x),
+            lambda: item_get(data)
+        ),
+        'setitem': (gdict_setitem, dict_setitem),
+        'deepget': (
+            lambda: x.deepget(deepkey),
+            lambda: dict_deepget(data, path)
+        ),
+        'deepset': (
+            lambda: x.deepset(deepkey, 1),
+            lambda: dict_deepset(data, path, 1)
+        ),
+        'deepcontain': (
+            lambda: x.deepcontain(deepkey),
+            lambda: dict_deepget(data, path, dict_deepget) is not dict_deepget
+        ),
+        'update': (
+            lambda: x.update(other),
+            lambda: data.update(other)
+        ),
+        'copy': (x.copy, data.copy),
+        'deepcopy': (
+            x.deepcopy,
+            lambda: copy.deepcopy(data)
+        ),
+        'pickle': (
+            lambda: pickle.loads(pickle.dumps(x, pickle.HIGHEST_PROTOCOL)),
+            lambda: pickle.loads(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        )
+    }
+
+
+def measure(function, repeat):
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e9, number
+
+
+def version():
+    for line in gdict.__doc__.split('\n'):
+        if line.startswith('@version: ', 4):
+            return line.split()[-1]
+
+
+def run(sizes, selected, repeat):
+    results = []
+
+    for shape, depth in SHAPES:
+        for size in sizes:
+            data, path = make_document(shape, size, depth)
+            nodes = count_nodes(data)
+
+            for op, functions in operations(data, path).items():
+                if selected and op not in selected:
+                    continue
+                timings = {}
+                for impl, function in zip(('gdict', 'dict'), functions):
+                    ns, number = measure(function, repeat)
+                    timings[impl] = ns
+                    results.append({
+                        'shape': shape, 'depth': depth, 'size': size,
+                        'nodes': nodes, 'op': op, 'impl': impl,
+                        'ns': round(ns, 1), 'number': number, 'repeat': repeat
+                    })
+                print(
+                    f'{shape:>10} depth {depth} {nodes:>8} nodes '
+                    f'{op:>11}: gdict {timings["gdict"]:>13.1f} ns, '
+                    f'dict {timings["dict"]:>13.1f} ns, '
+                    f'x{timings["gdict"] / timings["dict"]:.2f}',
+                    flush=True
+                )
+
+    return results
+
+
+def compare(results, baseline):
+    def key(result):
+        return (
+            result['shape'], result['depth'], result['size'],
+            result['op'], result['impl']
+        )
+
+    before = {key(r): r['ns'] for r in baseline['results']}
+    print(f'\ncompared with {baseline["meta"]["version"]} (gdict only):')
+
+    for result in results:
+        if result['impl'] != 'gdict' or key(result) not in before:
+            continue
+        change = result['ns'] / before[key(result)] - 1
+        print(
+            f'{result["shape"]:>10} depth {result["depth"]} '
+            f'{result["nodes"]:>8} nodes {result["op"]:>11}: '
+            f'{change:+7.1%}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes', type=lambda s: tuple(map(int, s.split(','))),
+        default=DEFAULT_SIZES, help='comma separated document sizes in nodes'
+    )
+    parser.add_argument(
+        '--quick', action='store_true', help=f'sizes {QUICK_SIZES}'
+    )
+    parser.add_argument(
+        '--ops', type=lambda s: set(s.split(',')), default=None,
+        help='comma separated operations, all by default'
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='the results of another run (JSON)')
+    args = parser.parse_args()
+
+    results = run(QUICK_SIZES if args.quick else args.sizes, args.ops,
+                  args.repeat)
+
+    output = {
+        'meta': {
+            'version': version(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        },
+        'results': results
+    }
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(output, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
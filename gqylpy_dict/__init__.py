@@ -41,7 +41,12 @@ This file is licensed under the WTFPL:
 
   0. You just DO WHAT THE FUCK YOU WANT TO.
 """
-from typing import Optional, Union, Tuple, List, Hashable, Any
+import os
+
+from typing import (
+    Optional, Union, Tuple, List, Dict, Hashable, Iterable, Iterator,
+    Callable, ContextManager, IO, Any
+)
 
 
 class gdict(dict):
@@ -91,6 +96,14 @@ class gdict(dict):
         'Tom'
         >>> my_dict['work_info']['position'] = 'Manager'
 
+    NOTE reading with dot notation gets the method for a key that is also the
+    name of a method of `gdict` (e.g. "keys", "copy", "track", "diff" and
+    "patch"), use the dictionary syntax to read such a key:
+
+        >>> my_dict = gdict({'diff': 'D'})
+        >>> my_dict['diff']
+        'D'
+
     Finally, the `gdict` class has multiple input formats when instantiating an
     object:
 
@@ -120,21 +133,25 @@ class gdict(dict):
         is another data type. For other data types, we can also use keyword
         arguments to pass them as initial values.
 
-        The `__init__` method accepts the newly converted `dict` and iterates
-        over each key-value pair, using the `__setitem__` method to add them to
-        the `dict`. In the `__setitem__` method, we use `value = gdict(value)`
-        to set the value as a `gdict` object, so that nested `gdict` objects are
-        created recursively when needed.
-
-        In this way, we can create a nested `gdict` of any level, with each
-        inner dictionary being a `gdict` object, thereby achieving the
-        conversion of any nested `dict`.
+        The `__init__` method accepts the newly converted `dict` and walks over
+        the data with an explicit stack (not recursion), each inner `dict` is
+        converted to a `gdict` object, each inner `list` or `tuple` is copied
+        with its items converted. In the `__setitem__` method, we use
+        `value = gdict(value)` to set the value as a `gdict` object too.
+
+        In this way, we can create a nested `gdict` of any level (there is no
+        recursion limit), with each inner dictionary being a `gdict` object,
+        thereby achieving the conversion of any nested `dict`. Each container
+        is converted only once, a subtree shared by several parents is still
+        shared after conversion, and a self-referencing structure keeps its
+        cycles (except a cycle through a `tuple`, which is created after its
+        items and therefore keeps the original `tuple`).
         """
         if isinstance(__data__, dict):
             return dict.__new__(cls)
 
         if isinstance(__data__, (list, tuple)):
-            return __data__.__class__(cls(v) for v in __data__)
+            return convert(__data__)
 
         return __data__
 
@@ -144,8 +161,7 @@ class gdict(dict):
         else:
             __data__.update(data)
 
-        for key, value in __data__.items():
-            dict.__setitem__(self, key, gdict(value))
+        convert(__data__, into=self)
 
     def __getattr__(self, key: str, /) -> Any:
         return self[key]
@@ -177,7 +193,7 @@ class gdict(dict):
     def copy(self) -> 'gdict':
         """Get a replica instance."""
 
-    def deepcopy(self) -> 'gdict':
+    def deepcopy(self, *, cow: bool = False) -> 'gdict':
         """
         Incomplete deep copy, NOTE not the same as `copy.deepcopy`!
 
@@ -185,9 +201,514 @@ class gdict(dict):
         `dict`, `list` and `tuple`).
 
         Backstory https://github.com/gqylpy/gqylpy-dict/issues/9
+
+        @param cow
+            Copy-on-write, the same as `snapshot`.
         """
         return gdict(self)
 
+    def snapshot(self) -> 'gdict':
+        """
+        Copy-on-write deep copy, the cost scales with what is changed instead
+        of with the data size.
+
+            >>> base = gdict({'db': {'host': 'localhost', 'port': 3306}})
+            >>> tenant = base.snapshot()
+            >>> tenant.db.port = 3307
+            >>> base.db.port
+            3306
+
+        The nested layers are shared by the snapshot and this instance (both
+        are switched to the copy-on-write mode), each layer is copied (shallow)
+        the first time it is reached through `__getitem__`, `__getattr__` or a
+        deep* method, so a write like `tenant.db.port = 3307` or
+        `tenant.deepset('db.port', 3307)` only copies the path to it.
+
+        A layer is switched back to a plain gdict once none of its values is
+        shared anymore. `track` and `memoize` copy the layers still shared
+        first (deeply), so they can be called on either side.
+
+        The inner layers obtained before the snapshot is taken are shared, so
+        they are sealed, writing to them raises TypeError, reach them again
+        from either side to write. The inner lists are replaced with copies,
+        the lists obtained before are no longer part of this instance.
+
+            >>> db = base.db
+            >>> tenant = base.snapshot()
+            >>> db.port = 3307  # TypeError
+            >>> base.db.port = 3307
+
+        NOTE the walk to seal them only goes through the layers reached since
+        the previous snapshot.
+        """
+
+    def dumps(
+            self,
+            *,
+            buffer_callback: Optional[Callable[[Any], Any]] = None
+    ) -> bytes:
+        """
+        Binary snapshot, the pickle stream (highest protocol) of this instance,
+        `gdict.loads` rebuilds the `gdict` instances directly without
+        converting again. The shared layers and reference cycles are kept, so
+        are the modes (e.g. the pending layers of `gdict.wrap`).
+
+            >>> x = gdict({'a': [{'b': 'B'}]})
+            >>> gdict.loads(x.dumps()).a[0].b
+            'B'
+
+        @param buffer_callback
+            Passed to `pickle.dumps`, the large `bytes` and `bytearray` values
+            (at least 64 KiB) are then sent out-of-band (protocol 5) instead of
+            being copied into the stream. `gdict.loads` uses the buffers as the
+            values when they are whole `bytes` or `bytearray`, without a copy.
+            Only `dumps` sends them out-of-band, not `pickle.dumps`.
+        """
+
+    @staticmethod
+    def loads(
+            data:    Union[bytes, bytearray, memoryview],
+            /,
+            *,
+            buffers: Optional[Iterable[Any]] = None
+    ) -> 'gdict':
+        """
+        Load a binary snapshot created by `dumps`.
+
+        @param buffers
+            The out-of-band buffers collected by the `buffer_callback` of
+            `dumps`, in the same order.
+
+        NOTE never load the data received from an untrusted source, like
+        `pickle.loads`.
+        """
+
+    def freeze(self) -> 'gdict':
+        """
+        Immutable deep copy, the nested dicts are frozen and the lists are
+        converted to tuples that compare equal to the lists with the same
+        items, so the frozen copy equals the original. It rejects any change
+        (`__setitem__`, `deepset`, `update`, etc.) with TypeError, and it is
+        hashable by its content, the hash is computed once and cached.
+
+            >>> x = gdict({'a': [{'b': 'B'}]}).freeze()
+            >>> x.a
+            ({'b': 'B'},)
+            >>> x == {'a': [{'b': 'B'}]}
+            True
+            >>> len({x, gdict({'a': [{'b': 'B'}]}).freeze()})
+            1
+
+        The frozen gdict instances are kept as they are (not copied), and so
+        are the shared ones. Other values are not copied, the hash raises
+        TypeError if any of them is not hashable. `gdict(frozen)` returns a
+        mutable copy (the frozen lists are lists again, the tuples remain
+        tuples).
+
+        NOTE the hash of a frozen gdict is not the hash of an equal gdict that
+        is not frozen (which is always -2), a set or a dict key deduplicates
+        the frozen ones among themselves only, freeze them all to deduplicate.
+        """
+
+    def flatten(
+            self,
+            *,
+            sep:        str = '.',
+            list_style: str = 'brackets'
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield the (deep key, value) of each leaf, in order, e.g. to export to
+        a key-value store. It is iterative, there is no limit on the depth.
+
+            >>> x = gdict({'a': [{'b': 'B'}], 'c': {}})
+            >>> dict(x.flatten())
+            {'a[0].b': 'B', 'c': {}}
+            >>> dict(x.flatten(sep='/', list_style='sep'))
+            {'a/0/b': 'B', 'c': {}}
+
+        The empty dicts and lists are leaves, so that `unflatten` restores
+        them. The keys are converted to strings. A reference cycle raises
+        ValueError.
+
+        @param sep
+            The separator of the keys.
+
+        @param list_style
+            "brackets" for the index in brackets (a deep key if `sep` is "."),
+            "sep" for the index joined by `sep`.
+        """
+
+    @classmethod
+    def unflatten(
+            cls,
+            data:       Union[dict, Iterable[Tuple[str, Any]]],
+            /,
+            *,
+            sep:        str = '.',
+            list_style: str = 'brackets'
+    ) -> 'gdict':
+        """
+        Build a gdict from the flat (deep key, value) items, the reverse of
+        `flatten`, much faster than `deepset` for each item.
+
+            >>> gdict.unflatten({'a[0].b': 'B', 'c': {}})
+            {'a': [{'b': 'B'}], 'c': {}}
+
+        The deep keys are merged first, then the data is built in one pass.
+        A layer is a list if its keys are all indexes (a number in brackets,
+        or a number in the "sep" style, negative too), each index is set like
+        `deepset` does, the indexes missing are None. A later item overrides
+        an earlier one, like `deepset`.
+
+        @param sep, list_style
+            See `flatten`.
+        """
+
+    def track(self) -> 'gdict':
+        """
+        Start tracking the changes, in place, return self. The writes through
+        `__setitem__`, `__setattr__`, `__delattr__`, `update`, `deepset`, etc.,
+        of this gdict or of its inner gdict instances (including the ones in a
+        list), record the deep keys of the changed paths, see `diff`.
+
+            >>> x = gdict({'a': [{'b': 'B'}], 'c': 'C'}).track()
+            >>> x.a[0].b = 'BB'
+            >>> del x.c
+            >>> x.diff()
+            [{'op': 'replace', 'path': 'a[0].b', 'value': 'BB'}, {'op': 'remove', 'path': 'c'}]
+
+        NOTE a change to a list itself (e.g. `x.a.append(...)`) is not tracked,
+        set the list again or use `deepset` to have it tracked. The tracking
+        is not copied nor pickled. It raises TypeError for the other modes
+        (`wrap`, `freeze`, `concurrent`, etc.).
+        """
+
+    def diff(self, *, reset: bool = False) -> List[dict]:
+        """
+        The changes since `track` (or since the last `reset`), as JSON Patch
+        (RFC 6902) operations whose paths are deep keys, one for each path
+        changed, so its size is the size of the changes, not of the data.
+        It is "add", "replace" or "remove" depending on whether the path
+        existed before and exists now, the value is a copy of the current one.
+
+            >>> x = gdict({'a': {'b': 'B'}}).track()
+            >>> x.a.b = 'BB'
+            >>> x.d = 'D'
+            >>> ops = x.diff(reset=True)
+            >>> ops
+            [{'op': 'replace', 'path': 'a.b', 'value': 'BB'}, {'op': 'add', 'path': 'd', 'value': 'D'}]
+            >>> replica.patch(ops)
+
+        @param reset
+            Forget the changes returned, the next `diff` returns the changes
+            from now on.
+        """
+
+    def patch(self, ops: Iterable[dict], /) -> None:
+        """
+        Apply JSON Patch (RFC 6902) operations, e.g. the result of `diff`. The
+        paths (and "from") are deep keys, the operations are "add", "remove",
+        "replace", "move", "copy" and "test".
+
+            >>> x = gdict({'a': [1, 2]})
+            >>> x.patch([
+            ...     {'op': 'add', 'path': 'a[0]', 'value': 0},
+            ...     {'op': 'move', 'from': 'a[2]', 'path': 'b'}
+            ... ])
+            >>> x
+            {'a': [0, 1], 'b': 2}
+
+        "add" to a list index inserts (index "-" appends), otherwise "add" and
+        "replace" set like `deepset`. A missing path raises KeyError, a failed
+        "test" or an invalid operation raises ValueError. The operations are
+        applied in order, those before a failed one remain applied.
+        """
+
+    def memoize(self, maxsize: int = 1024) -> 'gdict':
+        """
+        Memoize `deepget` (and `deepcontain`), in place, return self. The
+        result of a deep key is reused as long as the layers on its path are
+        unchanged, each gdict on the path has a version bumped by its writes
+        (`__setitem__`, `__setattr__`, `update`, `pop`, `deepset`, etc.), and
+        the item of each list on the path is checked to be still the same one.
+        So a repeated deep key costs a few comparisons instead of the walk.
+
+            >>> x = gdict({'a': {'b': [{'c': 'C'}]}}).memoize()
+            >>> x.deepget('a.b[0].c')
+            'C'
+            >>> x.a.b[0].c = 'CC'
+            >>> x.deepget('a.b[0].c')
+            'CC'
+            >>> x.memo_info()
+            {'hits': 0, 'misses': 2, 'maxsize': 1024, 'currsize': 1}
+
+        NOTE the patterns (e.g. "a.*.c") and the paths through a plain dict or
+        a `wrap` are not memoized, they are looked up as usual. A change of a
+        list in place (e.g. `append`) is seen by the item on the path only.
+        The memo is not copied nor pickled. It raises TypeError for the other
+        modes (`track`, `freeze`, `concurrent`, etc.).
+
+        @param maxsize
+            The maximum number of deep keys memoized, the least recently used
+            is evicted. 0 memoizes nothing (only the versions are kept).
+        """
+
+    def memo_info(self) -> Dict[str, int]:
+        """
+        The statistics of the memo, the number of `hits` and `misses`, the
+        `maxsize` and `currsize` (the number of deep keys memoized). It raises
+        TypeError if not `memoize`d.
+        """
+
+    @classmethod
+    def concurrent(
+            cls,
+            data:    Optional[dict] = None,
+            /,
+            *,
+            stripes: int            = 32
+    ) -> 'gdict':
+        """
+        Thread-safe gdict, the writes through it are atomic per top-level key,
+        including the deep writes (`deepset`, `deepsetdefault`, `deepset_many`)
+        which create the missing layers on the way, so two threads setting
+        sibling deep keys never lose each other's layers.
+
+            >>> x = gdict.concurrent()
+            >>> # In several threads:
+            >>> x.deepset('jobs.a.status', 'done')
+            >>> x.deepset('jobs.b.status', 'done')
+
+        Each top-level key is guarded by one of the `stripes` locks (by the
+        hash of the key), so the writes under different keys do not wait for
+        each other, and scale on the free-threaded builds of CPython. The reads
+        take no lock. `update`, `popitem` and `clear` take the locks of all
+        the keys involved.
+
+        NOTE only the writes through this instance are guarded, a write to an
+        inner layer got out of it (e.g. `x.jobs.a.status = 'done'`) is not.
+        `snapshot()` returns a plain deep copy.
+        """
+
+    @classmethod
+    def wrap(cls, data: dict, /) -> 'gdict':
+        """
+        Lazy conversion, return immediately instead of converting the whole
+        data up front. A nested `dict` or `list` is converted the first time it
+        is reached by `__getattr__`, `__getitem__` or a deep* method, and the
+        converted value replaces the original value in place.
+
+            >>> x = gdict.wrap({'a': [{'b': 'B'}]})
+            >>> x.a[0].b
+            'B'
+            >>> x == {'a': [{'b': 'B'}]}
+            True
+
+        The top layer is a shallow copy of `data`, the inner layers are shared
+        with `data` until they are reached, so don't modify `data` afterwards.
+        Values that have not been reached yet are still the original values
+        when the dict is read in C level (e.g. `json.dumps`), `values()` and
+        `items()` convert the current layer before returning.
+        """
+
+    @classmethod
+    def adopt(cls, data: Any, /) -> Any:
+        """
+        In-place conversion, for the data that is not used in plain form any
+        more (e.g. freshly parsed), without copying it: the lists are kept
+        with their items replaced, and each dict is moved into a gdict and
+        emptied at once, so the peak memory is much lower than `gdict(data)`.
+
+            >>> data = json.loads('{"a": [{"b": "B"}]}')
+            >>> x = gdict.adopt(data)
+            >>> x.a[0].b
+            'B'
+            >>> data
+            {}
+
+        NOTE the data is taken over: use the result, not `data`. The lists of
+        `data` are the lists of the result, each dict of `data` is emptied.
+        The shared subtrees remain shared, and the cycles are kept, including
+        through the tuples. The gdict instances in `data` are kept as they
+        are, the tuples are created again with their items adopted (a tuple
+        whose items are unchanged is kept).
+        """
+
+    @classmethod
+    def from_json(
+            cls,
+            data: Union[str, bytes, bytearray, IO],
+            /,
+            **kw
+    ) -> Union['gdict', list, Any]:
+        """
+        Parse a JSON document (a string, bytes, or a file object opened for
+        reading) into `gdict` instances directly, the objects are built as
+        `gdict` instances while parsing instead of being converted afterwards.
+
+            >>> x = gdict.from_json('{"a": [{"b": "B"}]}')
+            >>> x.a[0].b
+            'B'
+
+        @param kw
+            Passed to `json.loads`, e.g. `parse_float=decimal.Decimal`, except
+            `object_hook`.
+        """
+
+    @classmethod
+    def iter_ndjson(
+            cls,
+            file: Union[str, bytes, os.PathLike, IO],
+            /,
+            **kw
+    ) -> Iterator[Union['gdict', list, Any]]:
+        """
+        Parse a newline-delimited JSON file line by line, yield a `gdict`
+        instance per line, blank lines are skipped. Only one line is held in
+        memory at a time, so the file size is not limited.
+
+            >>> for record in gdict.iter_ndjson('records.ndjson'):
+            ...     record.user.name
+
+        @param file
+            A path (opened as UTF-8), or an iterable of lines in text or binary
+            (UTF-8), e.g. a file object or `gzip.open(...)`.
+
+        @param kw
+            Passed to `json.JSONDecoder`, the same as `from_json`.
+        """
+
+    @classmethod
+    def map_records(
+            cls,
+            records:   Iterable[Any],
+            /,
+            paths:     Optional[Iterable[str]] = None,
+            *,
+            workers:   Optional[int]           = None,
+            chunksize: int                     = 1000
+    ) -> Iterator[Any]:
+        """
+        Convert a batch of records in a process pool, chunk by chunk, yield
+        the `gdict` instances in order. The records are dicts, or JSON texts
+        (str or bytes, e.g. the lines of a NDJSON file, blank ones skipped),
+        which are decoded in the workers too.
+
+            >>> with open('records.ndjson', 'rb') as f:
+            ...     for id, name in gdict.map_records(f, ['id', 'user.name']):
+            ...         ...
+
+        The records are streamed, at most two chunks per worker are in flight.
+        The chunks and the results go through pickle, so the pool pays off
+        when the work per record (decoding, converting) outweighs it, e.g.
+        with JSON texts, or with `paths` (only the values are sent back).
+
+        @param paths
+            Deep keys, yield the list of their values of each record (None if
+            not exists, see `deepget_many`) instead of the record.
+
+        @param workers
+            The number of processes, the number of CPUs by default. 1 runs in
+            this process, without pool and pickle.
+
+        @param chunksize
+            The number of records sent to a worker at a time.
+        """
+
+    @classmethod
+    def open(
+            cls,
+            path: Union[str, bytes, os.PathLike],
+            /,
+            *,
+            mmap: bool = True
+    ) -> Union['gdict', list, Any]:
+        """
+        Open a JSON file, the file is memory-mapped and indexed (the positions
+        of its brackets), the objects and arrays are decoded one layer at a
+        time when they are reached by `__getattr__`, `__getitem__`, iteration
+        or a deep* method, so the time and memory scale with what is accessed
+        instead of with the file size.
+
+            >>> x = gdict.open('reference.json')
+            >>> x.regions[3].name
+            'eu-west-1'
+
+        The layers that have not been reached yet are not decoded when read in
+        C level, e.g. `json.dumps`, use `x.deepcopy()` to decode all of them
+        first. The index takes about 6 bytes per bracket, the file should not
+        be modified while it is opened.
+
+        @param mmap
+            If false, read and parse the whole file up front, the same as
+            `gdict.from_json(file)`.
+        """
+
+    @staticmethod
+    def share(data: dict, /, *, name: Optional[str] = None) -> Any:
+        """
+        Publish a copy of the data to a new shared memory segment (as compact
+        JSON and its bracket index), so that the processes (e.g. the prefork
+        workers) read one tree instead of each holding its own copy. Return the
+        `multiprocessing.shared_memory.SharedMemory`, attach it by its name.
+
+            >>> shm = gdict.share(catalog)
+            >>> # in each worker
+            >>> x = gdict.attach(shm.name)
+            >>> x.deepget('regions[3].name')
+            'eu-west-1'
+
+        The data must be JSON serializable (the keys are made strings). The
+        creator owns the segment, call `shm.close()` and `shm.unlink()` when
+        the workers are done with it.
+
+        @param name
+            The name of the segment, by default a unique name is generated.
+        """
+
+    @classmethod
+    def attach(cls, name: str, /) -> 'gdict':
+        """
+        Attach a tree published by `gdict.share`, read-only. The layers are
+        decoded from the segment when reached by `__getattr__`, `__getitem__`,
+        iteration or a deep* method, as `gdict.open`, only the decoded layers
+        take memory in the process. The mutators raise TypeError, `copy`
+        returns a writable copy of a layer and a pickled one is a plain gdict.
+        """
+
+    def deepupdate(
+            self,
+            data:        dict,
+            /,
+            *,
+            lists:       str                                     = 'replace',
+            on_conflict: Optional[Callable[[str, Any, Any], Any]] = None
+    ) -> None:
+        """
+        Merge the data into the gdict deeply, e.g. to layer a config overlay,
+        the nested dicts are merged instead of replaced (as `update` does).
+
+            >>> x = gdict({'db': {'host': 'a', 'port': 1}})
+            >>> x.deepupdate({'db': {'port': 2}})
+            >>> x
+            {'db': {'host': 'a', 'port': 2}}
+
+        Both are walked together once, only the values inserted are converted
+        and the subtrees without a change are not written.
+
+        @param lists
+            How a list is merged into a list:
+                'replace'  Replace it (the default).
+                'append'   Append the items to it.
+                'by_index' Merge the items by index, the extra ones appended.
+
+        @param on_conflict
+            Called as `on_conflict(deepkey, old, new)` for each value that
+            would be replaced (not merged and not equal), the value returned
+            is set, return `old` to keep it, or raise to refuse the overlay.
+            By default the new value is set.
+        """
+
     def deepget(
             self,
             deepkey: str,
@@ -203,12 +724,26 @@ class gdict(dict):
             >>> x.deepget('a[0].b')
             'B'
 
+        A deep key with a pattern returns the list of all the values matched,
+        in a single traversal:
+
+            >>> x = gdict({'a': [{'b': 1}, {'b': 2}, {'c': {'b': 3}}]})
+            >>> x.deepget('a[*].b')
+            [1, 2]
+            >>> x.deepget('a[1:].b')
+            [2]
+            >>> x.deepget('..b')
+            [1, 2, 3]
+
         @param deepkey
             Hierarchical keys, use "." join, if the next layer is an array then
-            use the index number to join.
+            use the index number to join. The patterns are "[*]" (each item of
+            a list or value of a dict), a slice such as "[2:10]" or "[::-1]",
+            and "..key" (the key at any depth below).
 
         @param default
-            If not get the depth value then return the default value.
+            If not get the depth value then return the default value. Not used
+            with a pattern, no match is an empty list.
 
         @param ignore
             Use tuple or list to specify one or more undesired values, if the
@@ -225,6 +760,10 @@ class gdict(dict):
             >>> x
             {'a': [None, {'b': 'B'}]}
 
+        A list is padded with None up to the index, a negative index pads at
+        the end and inserts the value in front. A list created is a `list`,
+        see `gdict.sparse` for the large indexes.
+
         @param deepkey
             Hierarchical keys, use "." join, if the next layer is an array then
             use the index number to join.
@@ -269,6 +808,255 @@ class gdict(dict):
             use the index number to join.
         """
 
+    def deepiter(self, deepkey: str, /) -> Iterator[Any]:
+        """
+        Yield the values matched by the deep key lazily, see the patterns of
+        `deepget`. A deep key without a pattern yields its value if it exists.
+
+            >>> x = gdict({'a': [{'b': 1}, {'b': 2}]})
+            >>> for b in x.deepiter('a[*].b'):
+            ...     print(b)
+            1
+            2
+
+        NOTE the writes (`deepset`, etc.) do not accept a pattern, they raise
+        ValueError.
+        """
+
+    def deepget_many(
+            self,
+            deepkeys: Union[Tuple[str], List[str]],
+            /,
+            default:  Optional[Any]                          = None,
+            *,
+            ignore:   Optional[Union[Tuple[Any], List[Any]]] = None,
+            asdict:   bool                                   = False
+    ) -> Union[list, dict]:
+        """
+        Get multiple depth values at once, the deep keys are merged into a
+        prefix trie, so each layer shared by several deep keys is walked only
+        once.
+
+            >>> x = gdict({'a': [{'b': 'B', 'c': 'C'}]})
+            >>> x.deepget_many(['a[0].b', 'a[0].c', 'a[1].b'])
+            ['B', 'C', None]
+
+        @param deepkeys
+            Multiple deep keys, see `deepget`.
+
+        @param default
+            The value of the deep keys that cannot be get.
+
+        @param ignore
+            See `deepget`.
+
+        @param asdict
+            Return a dict keyed by the deep keys, otherwise return a list in
+            the order of the deep keys.
+        """
+
+    def deepset_many(self, data: dict, /) -> None:
+        """
+        Set multiple depth values at once, a layer shared with a preceding
+        deep key is not walked again (unless it has been overwritten). Each
+        one has the same result as `deepset`, and they are set in order.
+
+            >>> x = gdict()
+            >>> x.deepset_many({'a[0].b': 'B', 'a[0].c': 'C'})
+            >>> x
+            {'a': [{'b': 'B', 'c': 'C'}]}
+
+        @param data
+            A dict (or an iterable of pairs) of the deep keys and the values.
+        """
+
+    def deepcontain_many(
+            self,
+            deepkeys: Union[Tuple[str], List[str]],
+            /,
+            *,
+            asdict:   bool = False
+    ) -> Union[List[bool], dict]:
+        """
+        The `deepcontain` of multiple deep keys, see `deepget_many`.
+
+            >>> x = gdict({'a': [{'b': 'B'}]})
+            >>> x.deepcontain_many(['a[0].b', 'a[1].b'])
+            [True, False]
+        """
+
+    @staticmethod
+    def compile(deepkey: str, /) -> 'DeepKey':
+        """
+        Parse a deep key once and return a reusable accessor, then the hot
+        path does no string parsing.
+
+            >>> k = gdict.compile('a[0].b')
+            >>> x = gdict({'a': [{'b': 'B'}]})
+            >>> k.get(x)
+            'B'
+            >>> k.set(x, 'C')
+            >>> k.contains(x)
+            True
+
+        The accessor provides `get(data, default=None, *, ignore=())`,
+        `set(data, value)`, `setdefault(data, default)` and `contains(data)`,
+        they are the same as `deepget`, `deepset`, `deepsetdefault` and
+        `deepcontain`, and can also be used for built-in `dict`.
+
+        The deep* methods share a bounded cache of the parsed deep keys, the
+        `compile` also reads the cache.
+        """
+
+    @staticmethod
+    def schema(spec: dict, /, name: str = 'Record') -> type:
+        """
+        Generate a record class (with `__slots__`) for the data of a known
+        shape, the fields are read as native attributes, and a record takes
+        much less memory than a gdict.
+
+            >>> Event = gdict.schema({
+            ...     'id': int,
+            ...     'user': {'name': str},
+            ...     'items': [{'sku': str, 'qty': int}]
+            ... }, name='Event')
+            >>> e = Event.from_gdict({'id': 1, 'user': {'name': 'Tom'}})
+            >>> e.user.name
+            'Tom'
+            >>> e.deepget('items[0].qty', 0)
+            0
+            >>> e.to_gdict()
+            {'id': 1, 'user': {'name': 'Tom'}, 'items': None}
+
+        @param spec
+            The fields, the value of a field is a nested spec for a nested
+            record class, or a list of a nested spec for a list of records,
+            anything else (e.g. a type) for a plain value, which is not
+            checked.
+
+        @param name
+            The name of the record class, the nested classes are named by the
+            path, e.g. "Event.user".
+
+        A record class has `from_gdict(data)` (the missing fields are None, the
+        keys not in the spec are dropped), and a record has `to_gdict()`,
+        `deepget`, `deepcontain`, `deepiter` and `record[name]`.
+
+        The records can be pickled (e.g. sent to the workers of a process pool)
+        if the spec can be, a record is pickled with the name and the spec of
+        its class, which is generated again (once per process) where loaded.
+        """
+
+    @staticmethod
+    def batch(records: Iterable[Any], /) -> List[Any]:
+        """
+        Build compact records from many dicts of the same keys (e.g. millions
+        of events), no spec needed. A record has no key table of its own, the
+        records of the same keys share one layout (the position of each key),
+        and keep their values in a list, nested dicts included.
+
+            >>> events = gdict.batch(json.loads(payload))
+            >>> e = events[0]
+            >>> e.user.name
+            'Tom'
+            >>> e.deepget('items[0].qty')
+            2
+            >>> e == {'id': 1, 'user': {'name': 'Tom'}, 'items': [{'qty': 2}]}
+            True
+
+        A record is read and written as a gdict (attributes, items, `keys`,
+        `get`, `update`, `pop`, `setdefault`, `deepget`, `deepset`, etc.), a
+        key added or deleted switches its layout. It is a `MutableMapping`
+        but not a `dict` instance, use `to_gdict()` (on a record or on the
+        whole batch) for the code that needs one, e.g. `json.dumps` (or pass
+        `default=gdict.json_default` to it).
+        """
+
+    @staticmethod
+    def sparse(iterable: Iterable[Any] = (), /) -> List[Any]:
+        """
+        A sparse list, only the items that are not None are stored (by index),
+        the others read as None. `deepset` pads it by its size only, so a
+        large index costs no memory for the None in between.
+
+            >>> x = gdict(events=gdict.sparse())
+            >>> x.deepset('events[5000000].id', 1)
+            >>> len(x.events), x.events[3], x.events[-1].id
+            (5000001, None, 1)
+
+        It is read as a list by the deep keys and `==`, but it is not a `list`
+        instance, `list(x.events)` is the dense list, and `json.dumps` needs
+        `default=gdict.json_default`.
+        """
+
+    @staticmethod
+    def json_default(value: Any, /) -> Any:
+        """
+        The `default` of `json.dumps` for the containers of gdict that are not
+        a `dict` nor a `list`: the sparse lists (`gdict.sparse`), the records
+        of `gdict.batch` and of `gdict.schema`. `gdict.share` uses it.
+
+            >>> x = gdict(events=gdict.sparse())
+            >>> x.deepset('events[2].id', 1)
+            >>> json.dumps(x, default=gdict.json_default)
+            '{"events": [null, null, {"id": 1}]}'
+
+        Other values raise TypeError, as `json.dumps` does.
+        """
+
+    @staticmethod
+    def to_columns(
+            records: Iterable[dict],
+            paths:   Iterable[str],
+            /,
+            dtypes:  Optional[Dict[str, Any]] = None,
+            *,
+            fill:    Any                      = ...,
+            numpy:   Optional[bool]           = None
+    ) -> Dict[str, Any]:
+        """
+        Extract a column (by deep key) from the records in bulk, instead of
+        calling `deepget` per record per deep key.
+
+            >>> records = [{'id': 1, 'pos': {'x': 0.5}}, {'id': 2}]
+            >>> gdict.to_columns(records, ['id', 'pos.x'], {'pos.x': 'd'})
+            {'id': [1, 2], 'pos.x': array('d', [0.5, nan])}
+
+        The deep keys are merged, and each layer is extracted for all the
+        records at once (in C when none is missing), then a typed column is
+        built in one go.
+
+        @param paths
+            The deep keys, see `deepget` (a pattern makes a column of lists).
+
+        @param dtypes
+            The dtype of the columns by the deep key, a column with a dtype is
+            a NumPy array if NumPy is used, otherwise an `array.array` whose
+            typecode is the dtype (e.g. "q", "d"). The other columns are lists.
+
+        @param fill
+            The value of the missing values, or a dict of it by the deep key.
+            By default NaN for a float column, 0 for an integer column, None
+            for a list column.
+
+        @param numpy
+            Use NumPy: None if it is installed, True requires it, False never.
+        """
+
+    @staticmethod
+    def from_columns(columns: Dict[str, Iterable[Any]], /) -> List['gdict']:
+        """
+        Build the records from the columns, the reverse of `to_columns`.
+
+            >>> gdict.from_columns({'id': [1, 2], 'pos.x': array('d', [.5, 1])})
+            [{'id': 1, 'pos': {'x': 0.5}}, {'id': 2, 'pos': {'x': 1.0}}]
+
+        The layers of all the records are created and set column by column in
+        bulk. A deep key with a list layer (e.g. "a[0]") is slower, it is set
+        by `deepset` record by record. It raises ValueError if the columns have
+        different lengths.
+        """
+
     @classmethod
     def getdeep(
             cls,
@@ -303,6 +1091,69 @@ class gdict(dict):
         )
         cls.deepset(data, deepkey, value)
 
+    @staticmethod
+    def enable_profiling() -> None:
+        """
+        Enable the profiling, the counters are read by `gdict.stats()`. While
+        it is enabled the profiled versions of the conversion, `deepget`,
+        `deepset` and the deep key parsing are in use, they are replaced back
+        by `disable_profiling`, so there is no cost while it is disabled.
+
+        The `deepget` of each mode (`memoize` included, a memoized hit counts
+        as a call) and of the records (`schema`, `batch`) is counted, and so
+        is the `deepset` of each mode (`track` and `concurrent` included).
+        The batch methods (`deepget_many`, `deepset_many`, etc.) and the
+        other deep* methods are not counted.
+
+            >>> gdict.enable_profiling()
+            >>> x = gdict({'a': [{'b': 'B'}]})
+            >>> x.deepget('a[0].c')
+            >>> gdict.stats()['deepget_misses']
+            1
+
+        The counters are not locked, the numbers may be slightly off when
+        several threads run the deep* methods at the same time.
+        """
+
+    @staticmethod
+    def disable_profiling() -> None:
+        """Disable the profiling, the counters are kept."""
+
+    @staticmethod
+    def stats(*, reset: bool = False) -> dict:
+        """
+        A snapshot of the profiling counters:
+            conversions, converted_nodes
+                The conversions (by `__init__`, `__setitem__`, etc.) and the
+                containers converted.
+            deepget_calls, deepget_misses
+                The misses are the calls whose path is not found.
+            deepset_calls, deepset_misses
+                The misses are the calls whose path is created (the layers).
+            path_parses, path_parse_time
+                The deep keys parsed and the time taken (in seconds).
+            path_cache_hits, path_cache_misses, path_cache_hit_rate
+                The cache of the parsed deep keys.
+            enabled
+                Whether the profiling is enabled.
+
+        @param reset
+            Reset the counters after taking the snapshot.
+        """
+
+    @staticmethod
+    def profile() -> ContextManager[dict]:
+        """
+        Profile a block, the dict it gives is filled with the counters of the
+        block when the block exits (the same keys as `stats()`), the counters
+        of the block are also added to the global counters.
+
+            >>> with gdict.profile() as stats:
+            ...     gdict({'a': [{'b': 'B'}]})
+            >>> stats['converted_nodes']
+            3
+        """
+
 
 class _xe6_xad_x8c_xe7_x90_xaa_xe6_x80_xa1_xe7_x8e_xb2_xe8_x90_x8d_xe4_xba_x91:
     import sys
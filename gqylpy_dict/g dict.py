@@ -3,7 +3,7 @@ Copyright (c) 2022-2024 GQYLPY <http://gqylpy.com>. All rights reserved.
 
 ────────────────────────────────────────────────────────────────────────────────
 
-Lines 51 through 99 is licensed under the Apache-2.0:
+Lines 71 through 119 is licensed under the Apache-2.0:
 
     Licensed under the Apache License, Version 2.0 (the "License");
     you may not use this file except in compliance with the License.
@@ -37,16 +37,36 @@ All other code is licensed under the WTFPL:
 
 ────────────────────────────────────────────────────────────────────────────────
 """
+import os
 import re
 import sys
+import json
+import mmap
+import time
+import struct
+import pickle
 import builtins
+import threading
 
 from copy import copy, deepcopy
-
-from typing import Type, Final, Optional, Union, Tuple, List, Hashable, Any
+from collections import deque
+from collections.abc import MutableMapping
+from array import array
+from operator import is_, itemgetter
+from itertools import islice, repeat, accumulate
+from keyword import iskeyword
+from functools import lru_cache
+from contextlib import contextmanager
+
+from typing import (
+    Type, Final, Optional, Union, Tuple, List, Dict, Hashable, Iterable,
+    Iterator, Callable, ContextManager, IO, NoReturn, Any
+)
 
 __unique__: Final = object()
 
+OUT_OF_BAND_SIZE: Final = 1 << 16
+
 
 class MasqueradeClass(type):
     """
@@ -99,23 +119,40 @@ MasqueradeClass.__name__ = type.__name__
 builtins.MasqueradeClass = MasqueradeClass
 
 
+class classonly:
+    """
+    A `classmethod` or `staticmethod` reached from the class only. Reached from
+    an instance it raises AttributeError, so that `__getattr__` returns the key
+    of the same name (e.g. `gdict({'stats': 1}).stats` is 1).
+    """
+    __slots__ = ('method',)
+
+    def __init__(self, method: Union[classmethod, staticmethod], /):
+        self.method = method
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is not None:
+            raise AttributeError(self.method.__func__.__name__)
+        return self.method.__get__(None, owner)
+
+
 class GqylpyDict(dict, metaclass=MasqueradeClass):
 
     def __init__(self, __data__=None, /, **data):
         if __data__ is None:
             __data__ = data
-        else:
+        elif data:
             __data__.update(data)
 
-        for name, value in __data__.items():
-            dict.__setitem__(self, name, GqylpyDict(value))
+        if __data__:
+            convert(__data__, into=self)
 
     def __new__(cls, __data__={}, /, **data):
         if isinstance(__data__, dict):
             return dict.__new__(cls)
 
         if isinstance(__data__, (list, tuple)):
-            return __data__.__class__(cls(v) for v in __data__)
+            return convert(__data__)
 
         return __data__
 
@@ -136,19 +173,247 @@ class GqylpyDict(dict, metaclass=MasqueradeClass):
     def __hash__(self) -> int:
         return -2
 
-    def __reduce__(self) -> Tuple[Type['GqylpyDict'], Tuple[dict]]:
-        return GqylpyDict, (dict(self),)
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], Any]:
+        # Rebuild without converting again, the values are already converted.
+        # The state is set after the instance is created, so that the cycles
+        # are kept. The instance attributes (e.g. the pending keys) are kept.
+        if self.__dict__:
+            return dict.__new__, (self.__class__,), (dict(self), self.__dict__)
+        return dict.__new__, (self.__class__,), dict(self)
+
+    def __reduce_ex__(self, protocol: int, /) -> Tuple[Any, ...]:
+        reduced = self.__reduce__()
+        if buffer_passing.enabled:
+            # Large bytes are passed as `pickle.PickleBuffer`, so they are sent
+            # out-of-band, only by `dumps` with a `buffer_callback`, the values
+            # of the other pickling are not scanned. A state in a tuple has its
+            # buffers restored by `__setstate__`.
+            state = reduced[2]
+            if state.__class__ is dict:
+                if pass_buffers(state):
+                    reduced = reduced[:2] + ((state, None),)
+            else:
+                pass_buffers(state[0])
+        return reduced
+
+    def __setstate__(
+            self,
+            state: Union[dict, Tuple[dict, Optional[dict]]],
+            /
+    ) -> None:
+        if state.__class__ is dict:
+            dict.update(self, state)
+            return
+        data, attrs = state
+        dict.update(self, restore_buffers(data))
+        if attrs:
+            self.__dict__.update(attrs)
 
     def __copy__(self) -> 'GqylpyDict':
-        copied = GqylpyDict()
-        for name, value in self.items():
-            dict.__setitem__(copied, name, value)
+        # Shallow, the values are already converted.
+        copied = dict.__new__(GqylpyDict)
+        dict.update(copied, self)
         return copied
 
     copy = __copy__
 
-    def deepcopy(self) -> 'GqylpyDict':
-        return GqylpyDict(self)
+    def deepcopy(self, *, cow: bool = False) -> 'GqylpyDict':
+        return self.snapshot() if cow else GqylpyDict(self)
+
+    def dumps(
+            self,
+            *,
+            buffer_callback: Optional[Callable[[Any], Any]] = None
+    ) -> bytes:
+        if buffer_callback is None:
+            return pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+        buffer_passing.enabled = True
+        try:
+            return pickle.dumps(
+                self, pickle.HIGHEST_PROTOCOL, buffer_callback=buffer_callback
+            )
+        finally:
+            buffer_passing.enabled = False
+
+    @classonly
+    @staticmethod
+    def loads(
+            data:    Union[bytes, bytearray, memoryview],
+            /,
+            *,
+            buffers: Optional[Iterable[Any]] = None
+    ) -> Any:
+        return pickle.loads(data, buffers=buffers)
+
+    def snapshot(self) -> 'CowGqylpyDict':
+        cow_seal(self)
+        # Not `in`, the classes compare equal by `MasqueradeClass.__eq__`.
+        if self.__class__ is GqylpyDict or \
+                self.__class__ is LazyGqylpyDict or \
+                self.__class__ is MappedGqylpyDict:
+            object.__setattr__(self, '__class__', CowGqylpyDict)
+        if isinstance(self, LazyGqylpyDict):
+            object.__setattr__(self, '__pending__', set(self))
+        return cow_copy(self)
+
+    def freeze(self) -> 'FrozenGqylpyDict':
+        return freeze(self)
+
+    def flatten(
+            self,
+            *,
+            sep:        str = '.',
+            list_style: str = 'brackets'
+    ) -> Iterator[Tuple[str, Any]]:
+        return flatten(self, sep, list_style)
+
+    @classonly
+    @classmethod
+    def unflatten(
+            cls,
+            __data__:   Union[dict, Iterable[Tuple[str, Any]]],
+            /,
+            *,
+            sep:        str = '.',
+            list_style: str = 'brackets'
+    ) -> 'GqylpyDict':
+        return unflatten(__data__, sep, list_style)
+
+    def track(self) -> 'TrackedGqylpyDict':
+        if self.__class__ is CowGqylpyDict:
+            cow_detach(self)
+        if self.__class__ is not GqylpyDict and \
+                self.__class__ is not TrackedGqylpyDict:
+            raise TypeError(
+                f'cannot track a "{self.__class__.__real_name__}".'
+            )
+        track_node(self, ChangeJournal(), '')
+        return self
+
+    def diff(self, *, reset: bool = False) -> List[dict]:
+        journal: Optional[ChangeJournal] = self.__dict__.get('__journal__')
+        if journal is None:
+            raise TypeError('the changes are not tracked, call "track" first.')
+        ops: List[dict] = journal.diff(self)
+        if reset:
+            journal.paths.clear()
+        return ops
+
+    def patch(self, ops: Iterable[dict], /) -> None:
+        for op in ops:
+            apply_patch_op(self, op)
+
+    def memoize(self, maxsize: int = 1024) -> 'MemoGqylpyDict':
+        if self.__class__ is CowGqylpyDict:
+            cow_detach(self)
+        if self.__class__ is not GqylpyDict and \
+                self.__class__ is not MemoGqylpyDict:
+            raise TypeError(
+                f'cannot memoize a "{self.__class__.__real_name__}".'
+            )
+        if maxsize < 0:
+            raise ValueError(f'maxsize must be at least 0, not {maxsize}.')
+        if self.__class__ is GqylpyDict:
+            version_node(self)
+        object.__setattr__(self, '__memo__', DeepGetMemo(maxsize))
+        return self
+
+    def memo_info(self) -> Dict[str, int]:
+        memo: Optional[DeepGetMemo] = self.__dict__.get('__memo__')
+        if memo is None:
+            raise TypeError('the deepget is not memoized, call "memoize".')
+        return {
+            'hits':     memo.hits,
+            'misses':   memo.misses,
+            'maxsize':  memo.maxsize,
+            'currsize': len(memo.entries)
+        }
+
+    @classonly
+    @classmethod
+    def concurrent(
+            cls,
+            __data__: Optional[dict] = None,
+            /,
+            *,
+            stripes:  int            = 32
+    ) -> 'ConcurrentGqylpyDict':
+        node = dict.__new__(ConcurrentGqylpyDict)
+        object.__setattr__(node, '__locks__', new_locks(stripes))
+        if __data__ is not None:
+            convert(__data__, into=node)
+        return node
+
+    @classonly
+    @classmethod
+    def wrap(cls, __data__: dict, /) -> 'LazyGqylpyDict':
+        return lazy_convert(__data__)
+
+    @classonly
+    @classmethod
+    def adopt(cls, __data__: Any, /) -> Any:
+        return adopt(__data__)
+
+    @classonly
+    @classmethod
+    def from_json(
+            cls,
+            __data__: Union[str, bytes, bytearray, IO],
+            /,
+            **kw
+    ) -> Any:
+        if hasattr(__data__, 'read'):
+            __data__ = __data__.read()
+        return json.loads(__data__, object_hook=json_object_hook, **kw)
+
+    @classonly
+    @classmethod
+    def iter_ndjson(
+            cls,
+            file: Union[str, bytes, os.PathLike, IO],
+            /,
+            **kw
+    ) -> Iterator[Any]:
+        return read_ndjson(file, **kw)
+
+    @classonly
+    @classmethod
+    def map_records(
+            cls,
+            records:   Iterable[Any],
+            /,
+            paths:     Optional[Iterable[str]] = None,
+            *,
+            workers:   Optional[int]           = None,
+            chunksize: int                     = 1000
+    ) -> Iterator[Any]:
+        return map_records(
+            records, paths, workers=workers, chunksize=chunksize
+        )
+
+    @classonly
+    @classmethod
+    def open(
+            cls,
+            path: Union[str, bytes, os.PathLike],
+            /,
+            *,
+            mmap: bool = True
+    ) -> Any:
+        if mmap:
+            return open_mapped(path)
+        with open(path, 'rb') as f:
+            return cls.from_json(f)
+
+    @classonly
+    @staticmethod
+    def share(__data__: dict, /, *, name: Optional[str] = None) -> Any:
+        return share(__data__, name)
+
+    @classonly
+    @classmethod
+    def attach(cls, name: str, /) -> 'SharedGqylpyDict':
+        return attach(name)
 
     def update(self, __data__: Optional[dict] = None, /, **data) -> None:
         try:
@@ -161,6 +426,16 @@ class GqylpyDict(dict, metaclass=MasqueradeClass):
                 f'updated object must be a "dict", not "{x}".'
             ) from None
 
+    def deepupdate(
+            self,
+            __data__:    dict,
+            /,
+            *,
+            lists:       str                                     = 'replace',
+            on_conflict: Optional[Callable[[str, Any, Any], Any]] = None
+    ) -> None:
+        deepupdate(self, __data__, lists, on_conflict)
+
     def deepget(
             self,
             deepkey: str,
@@ -169,85 +444,116 @@ class GqylpyDict(dict, metaclass=MasqueradeClass):
             *,
             ignore:  Union[Tuple[Any], List[Any]] = ()
     ) -> Any:
-        deepkey = deepkey[:-1] if deepkey and deepkey[-1] == ']' else deepkey
-        value = self
-
-        for key in re.split(r'\.|\[|][.\[]', deepkey):
-            if isinstance(value, (list, tuple)):
-                try:
-                    key = int(key)
-                except ValueError:
-                    return default
-            try:
-                value = value[key]
-            except KeyError:
-                try:
-                    if key.isdigit() or key[0] == '-' and key[1:].isdigit():
-                        value = value[int(key)]
-                    elif key == 'None':
-                        value = value[None]
-                    elif key == 'True':
-                        value = value[True]
-                    elif key == 'False':
-                        value = value[False]
-                    elif key == 'Ellipsis':
-                        value = value[...]
-                    else:
-                        return default
-                except (KeyError, IndexError):
-                    return default
-            except (IndexError, TypeError):
-                return default
-
-        return default if value in ignore else value
+        return compile_deepkey(deepkey).get(self, default, ignore=ignore)
 
     def deepset(self, deepkey: str, value: Any) -> None:
-        existing_keys, nonexistent_keys = re.split(r'[.\[]', deepkey), []
-        last_key: str = int_key(existing_keys.pop())
+        compile_deepkey(deepkey).set(self, value)
 
-        while existing_keys:
-            data = GqylpyDict.deepget(self, '.'.join(existing_keys), __unique__)
-            # Why `GqylpyDict.deepget`? Compatible with built-in dict instance.
-
-            key: str = int_key(existing_keys.pop())
+    def deepsetdefault(self, deepkey: str, default: Any) -> Any:
+        return compile_deepkey(deepkey).setdefault(self, default)
 
-            if data is not __unique__:
-                try:
-                    next_key = nonexistent_keys[0]
-                except IndexError:
-                    next_key = last_key
-                if (
-                        next_key.__class__ is str and not isinstance(data, dict)
-                                                  or
-                        next_key.__class__ is int and data.__class__ is not list
-                ):
-                    data = GqylpyDict.deepget(self, '.'.join(existing_keys)) \
-                        if existing_keys else self
-                    nonexistent_keys.insert(0, key)
-                break
-            nonexistent_keys.insert(0, key)
-        else:
-            data = self
+    def deepcontain(self, deepkey: str, /) -> bool:
+        return compile_deepkey(deepkey).contains(self)
 
-        for i, key in enumerate(nonexistent_keys):
-            try:
-                next_key = nonexistent_keys[i + 1]
-            except IndexError:
-                next_key = last_key
-            next_data = GqylpyDict() if next_key.__class__ is str else []
-            data = set_next_data(data, key, next_data)
-        set_next_data(data, last_key, value)
+    def deepiter(self, deepkey: str, /) -> Iterator[Any]:
+        return compile_deepkey(deepkey).iterate(self)
 
-    def deepsetdefault(self, deepkey: str, default: Any) -> Any:
-        value = GqylpyDict.deepget(self, deepkey, __unique__)
-        if value is __unique__:
-            GqylpyDict.deepset(self, deepkey, default)
-            return default
-        return value
+    def deepget_many(
+            self,
+            deepkeys: Union[Tuple[str], List[str]],
+            /,
+            default:  Optional[Any]                = None,
+            *,
+            ignore:   Union[Tuple[Any], List[Any]] = (),
+            asdict:   bool                         = False
+    ) -> Union[list, dict]:
+        deepkeys = tuple(deepkeys)
+        values = compile_deepkeys(deepkeys).get(self, default, ignore=ignore)
+        return dict(zip(deepkeys, values)) if asdict else values
+
+    def deepset_many(self, __data__: dict, /) -> None:
+        items = tuple(
+            __data__.items() if isinstance(__data__, dict) else __data__
+        )
+        if items:
+            deepkeys, values = zip(*items)
+            compile_deepkeys(deepkeys).set(self, values)
 
-    def deepcontain(self, deepkey: str, /) -> bool:
-        return False if GqylpyDict.deepget(self, deepkey, __unique__) is \
-                        __unique__ else True
+    def deepcontain_many(
+            self,
+            deepkeys: Union[Tuple[str], List[str]],
+            /,
+            *,
+            asdict:   bool = False
+    ) -> Union[List[bool], dict]:
+        deepkeys = tuple(deepkeys)
+        values = compile_deepkeys(deepkeys).contains(self)
+        return dict(zip(deepkeys, values)) if asdict else values
+
+    @classonly
+    @staticmethod
+    def compile(deepkey: str, /) -> 'DeepKey':
+        return compile_deepkey(deepkey)
+
+    @classonly
+    @staticmethod
+    def schema(spec: dict, /, name: str = 'Record') -> Type['GqylpyRecord']:
+        return schema(spec, name)
+
+    @classonly
+    @staticmethod
+    def batch(records: Iterable[Any], /) -> 'RecordBatch':
+        return batch(records)
+
+    @classonly
+    @staticmethod
+    def sparse(iterable: Iterable[Any] = (), /) -> 'SparseList':
+        return SparseList(iterable)
+
+    @classonly
+    @staticmethod
+    def json_default(value: Any, /) -> Any:
+        return json_default(value)
+
+    @classonly
+    @staticmethod
+    def to_columns(
+            records: Iterable[dict],
+            paths:   Iterable[str],
+            /,
+            dtypes:  Optional[Dict[str, Any]] = None,
+            *,
+            fill:    Any                      = __unique__,
+            numpy:   Optional[bool]           = None
+    ) -> Dict[str, Any]:
+        return to_columns(records, paths, dtypes, fill=fill, numpy=numpy)
+
+    @classonly
+    @staticmethod
+    def from_columns(
+            columns: Dict[str, Iterable[Any]], /
+    ) -> List['GqylpyDict']:
+        return from_columns(columns)
+
+    @classonly
+    @staticmethod
+    def enable_profiling() -> None:
+        enable_profiling()
+
+    @classonly
+    @staticmethod
+    def disable_profiling() -> None:
+        disable_profiling()
+
+    @classonly
+    @staticmethod
+    def stats(*, reset: bool = False) -> dict:
+        return profile_stats(reset=reset)
+
+    @classonly
+    @staticmethod
+    def profile() -> ContextManager[dict]:
+        return profile()
 
     getdeep, setdeep = deepget, deepset
 
@@ -258,29 +564,3300 @@ class GqylpyDict(dict, metaclass=MasqueradeClass):
     # Compatible metaclass `abc.ABCMeta`.
 
 
-def int_key(key: str, /) -> Union[int, str]:
-    try:
-        return int(key[:-1])
-    except ValueError:
-        return key
+class LazyGqylpyDict(GqylpyDict):
+    # Values of the keys in `__pending__` are still the caller's raw data, they
+    # are converted the first time they are reached and written back in place.
+
+    def __init__(self, __data__=None, /, **data):
+        object.__setattr__(self, '__pending__', set())
+        GqylpyDict.__init__(self, __data__, **data)
+
+    def __getitem__(self, name: Hashable, /) -> Any:
+        value = dict.__getitem__(self, name)
+        if name in self.__pending__:
+            value = self.__convert__(value)
+            dict.__setitem__(self, name, value)
+            self.__pending__.discard(name)
+        return value
 
+    @staticmethod
+    def __convert__(value: Any, /) -> Any:
+        return lazy_convert(value)
 
-def set_next_data(
-        data:  Union[dict, list],
-        key:   Union[int, str],
-        value: Any
-) -> Any:
-    try:
-        data[key] = value
-    except IndexError:
-        if key in (0, -1):
-            data.append(value)
-        elif key > 0:
-            for _ in range(key - len(data)):
-                data.append(None)
-            data.append(value)
-        else:
-            for _ in range(abs(key) - len(data) - 1):
-                data.append(None)
-            data.insert(0, value)
-    return data[key]
+    def __setitem__(self, name: Hashable, value: Any, /) -> None:
+        GqylpyDict.__setitem__(self, name, value)
+        self.__pending__.discard(name)
+
+    def __delitem__(self, name: Hashable, /) -> None:
+        dict.__delitem__(self, name)
+        self.__pending__.discard(name)
+
+    def __copy__(self) -> 'LazyGqylpyDict':
+        copied = dict.__new__(self.__class__)
+        dict.update(copied, self)
+        object.__setattr__(copied, '__pending__', set(self.__pending__))
+        return copied
+
+    copy = __copy__
+
+    def __materialize__(self) -> None:
+        for name in tuple(self.__pending__):
+            self[name]
+
+    def get(self, name: Hashable, default: Any = None, /) -> Any:
+        return self[name] if name in self else default
+
+    def setdefault(self, name: Hashable, default: Any = None, /) -> Any:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def pop(self, name: Hashable, default: Any = __unique__, /) -> Any:
+        if name not in self:
+            if default is __unique__:
+                raise KeyError(name)
+            return default
+        value = self[name]
+        del self[name]
+        return value
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        name, value = dict.popitem(self)
+        if name in self.__pending__:
+            self.__pending__.discard(name)
+            value = self.__convert__(value)
+        return name, value
+
+    def clear(self) -> None:
+        dict.clear(self)
+        self.__pending__.clear()
+
+    def values(self):
+        self.__materialize__()
+        return dict.values(self)
+
+    def items(self):
+        self.__materialize__()
+        return dict.items(self)
+
+    def update(self, __data__: Optional[dict] = None, /, **data) -> None:
+        GqylpyDict.update(self, __data__, **data)
+        if isinstance(__data__, dict):
+            self.__pending__.difference_update(__data__)
+        self.__pending__.difference_update(data)
+
+
+class CowGqylpyDict(LazyGqylpyDict):
+    # Copy-on-write, the values of the keys in `__pending__` may be shared with
+    # other snapshots, they are copied (shallow, one layer) the first time they
+    # are reached, so a write only copies the path to it.
+
+    def __getitem__(self, name: Hashable, /) -> Any:
+        value = LazyGqylpyDict.__getitem__(self, name)
+        if not self.__pending__:
+            # No layer is shared anymore, back to a plain gdict.
+            cow_restore(self)
+        return value
+
+    @staticmethod
+    def __convert__(value: Any, /) -> Any:
+        return cow_copy(value)
+
+    def __copy__(self) -> 'CowGqylpyDict':
+        return self.snapshot()
+
+    copy = __copy__
+
+
+class SealedGqylpyDict(GqylpyDict):
+    # A layer shared by a snapshot and its source, sealed by `snapshot`. They
+    # copy it when reached, so a write to it could only come through a
+    # reference taken before the snapshot, which would leak into both.
+
+    def __getitem__(self, name: Hashable, /) -> Any:
+        value = dict.__getitem__(self, name)
+        if value.__class__ is MappedSpan or \
+                isinstance(value, dict) and not isinstance(value, GqylpyDict):
+            # Still pending in the layer sealed, read as a copy.
+            return cow_copy(value)
+        return value
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], dict]:
+        return dict.__new__, (GqylpyDict,), dict(self)
+
+    def __sealed__(self, *a, **kw) -> NoReturn:
+        raise TypeError(
+            'the gdict is shared with a snapshot, reach it again from the '
+            'snapshot or its source to write'
+        )
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = __ior__ = \
+        update = setdefault = pop = popitem = clear = deepupdate = \
+        deepset = deepsetdefault = deepset_many = __sealed__
+
+    def __copy__(self) -> 'CowGqylpyDict':
+        return cow_copy(self)
+
+    copy = __copy__
+
+
+class MappedGqylpyDict(LazyGqylpyDict):
+    # Opened by `gdict.open`, the values of the keys in `__pending__` are spans
+    # of the memory-mapped JSON document, each is decoded (one layer) the first
+    # time it is reached.
+
+    @staticmethod
+    def __convert__(value: Any, /) -> Any:
+        return value.load() if value.__class__ is MappedSpan else value
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], Any]:
+        self.__materialize__()
+        return GqylpyDict.__reduce__(self)
+
+
+class SharedGqylpyDict(MappedGqylpyDict):
+    # Attached by `gdict.attach`, read-only, the layers are decoded from the
+    # shared memory segment in each process, as in `MappedGqylpyDict`. The
+    # decoded values are cached by `dict.__setitem__`, not by the mutators.
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], dict]:
+        # Rebuilt as a plain gdict, the segment may not exist where loaded.
+        self.__materialize__()
+        return dict.__new__, (GqylpyDict,), dict(self)
+
+    def __readonly__(self, *a, **kw) -> NoReturn:
+        raise TypeError('shared gdict is read-only')
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = __ior__ = \
+        update = setdefault = pop = popitem = clear = deepupdate = \
+        deepset = deepsetdefault = deepset_many = __readonly__
+
+    def __copy__(self) -> MappedGqylpyDict:
+        # A writable copy of the layer, the nested layers are still shared.
+        copied = dict.__new__(MappedGqylpyDict)
+        dict.update(copied, self)
+        object.__setattr__(copied, '__pending__', set(self.__pending__))
+        return copied
+
+    copy = __copy__
+
+    def snapshot(self) -> 'CowGqylpyDict':
+        return self.copy().snapshot()
+
+
+class FrozenGqylpyDict(GqylpyDict):
+    # Immutable, created by `freeze`. The hash is the hash of the content,
+    # computed once and cached, it is not pickled (the hash of a string varies
+    # between processes).
+
+    def __hash__(self) -> int:
+        try:
+            return self.__dict__['__content_hash__']
+        except KeyError:
+            value = hash(frozenset(dict.items(self)))
+            object.__setattr__(self, '__content_hash__', value)
+            return value
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], dict]:
+        return dict.__new__, (self.__class__,), dict(self)
+
+    def __readonly__(self, *a, **kw) -> NoReturn:
+        raise TypeError('frozen gdict is immutable')
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = __ior__ = \
+        update = setdefault = pop = popitem = clear = deepupdate = \
+        deepset = deepsetdefault = deepset_many = __readonly__
+
+    def __copy__(self) -> 'FrozenGqylpyDict':
+        return self
+
+    copy = __copy__
+
+    def deepcopy(self, *, cow: bool = False) -> 'FrozenGqylpyDict':
+        return self
+
+
+class FrozenList(tuple):
+    """
+    A list frozen by `freeze`, a tuple that compares equal to the lists with
+    the same items, so a frozen gdict equals the gdict it was frozen from. The
+    converter turns it back to a list.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other: Any, /) -> bool:
+        if other.__class__ is list:
+            other = tuple(other)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other: Any, /) -> bool:
+        if other.__class__ is list:
+            other = tuple(other)
+        return tuple.__ne__(self, other)
+
+    __hash__ = tuple.__hash__
+
+
+class ConcurrentGqylpyDict(GqylpyDict):
+    # Created by `gdict.concurrent`. The writes through this instance are
+    # atomic per top-level key, each key is guarded by one of the locks in
+    # `__locks__` (by the hash of the key, lock striping), so the writes under
+    # different keys run in parallel. The reads take no lock. The locks are
+    # reentrant, a deep write sets the top-level key through `__setitem__`.
+
+    def __stripe__(self, name: Hashable, /) -> threading.RLock:
+        locks: Tuple[threading.RLock, ...] = self.__locks__
+        return locks[stripe_of(name, len(locks))]
+
+    def __stripes__(self, names: Iterable[Hashable], /) -> 'AcquiredLocks':
+        locks: Tuple[threading.RLock, ...] = self.__locks__
+        return AcquiredLocks(
+            locks[i] for i in sorted({stripe_of(n, len(locks)) for n in names})
+        )
+
+    def __setitem__(self, name: Hashable, value: Any, /) -> None:
+        if not isinstance(value, GqylpyDict):
+            value = GqylpyDict(value)
+        with self.__stripe__(name):
+            dict.__setitem__(self, name, value)
+
+    def __delitem__(self, name: Hashable, /) -> None:
+        with self.__stripe__(name):
+            dict.__delitem__(self, name)
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], Tuple[dict, int]]:
+        # The locks are created again, by their number.
+        return dict.__new__, (self.__class__,), \
+            (dict(self), len(self.__locks__))
+
+    def __setstate__(self, state: Tuple[dict, int], /) -> None:
+        data, stripes = state
+        object.__setattr__(self, '__locks__', new_locks(stripes))
+        dict.update(self, restore_buffers(data))
+
+    def setdefault(self, name: Hashable, default: Any = None, /) -> Any:
+        with self.__stripe__(name):
+            return dict.setdefault(self, name, default)
+
+    def pop(self, name: Hashable, default: Any = __unique__, /) -> Any:
+        with self.__stripe__(name):
+            if default is __unique__:
+                return dict.pop(self, name)
+            return dict.pop(self, name, default)
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        with AcquiredLocks(self.__locks__):
+            return dict.popitem(self)
+
+    def clear(self) -> None:
+        with AcquiredLocks(self.__locks__):
+            dict.clear(self)
+
+    def update(self, __data__: Optional[dict] = None, /, **data) -> None:
+        # Convert first, without holding any lock.
+        other = dict.__new__(GqylpyDict)
+        GqylpyDict.update(other, __data__, **data)
+        with self.__stripes__(other):
+            dict.update(self, other)
+
+    def deepupdate(
+            self,
+            __data__:    dict,
+            /,
+            *,
+            lists:       str                                     = 'replace',
+            on_conflict: Optional[Callable[[str, Any, Any], Any]] = None
+    ) -> None:
+        with self.__stripes__(__data__):
+            deepupdate(self, __data__, lists, on_conflict)
+
+    def snapshot(self) -> GqylpyDict:
+        # The copy-on-write needs the source to switch to it too, which
+        # cannot be done safely while other threads are writing.
+        return GqylpyDict(self)
+
+    def deepset(self, deepkey: str, value: Any) -> None:
+        deepkey: DeepKey = compile_deepkey(deepkey)
+        with self.__stripe__(deepkey.keys[0][3]):
+            deepkey.set(self, value)
+
+    def deepsetdefault(self, deepkey: str, default: Any) -> Any:
+        deepkey: DeepKey = compile_deepkey(deepkey)
+        with self.__stripe__(deepkey.keys[0][3]):
+            return deepkey.setdefault(self, default)
+
+    def deepset_many(self, __data__: dict, /) -> None:
+        items = tuple(
+            __data__.items() if isinstance(__data__, dict) else __data__
+        )
+        names = (compile_deepkey(deepkey).keys[0][3] for deepkey, _ in items)
+        with self.__stripes__(names):
+            GqylpyDict.deepset_many(self, items)
+
+    setdeep = deepset
+
+
+class AcquiredLocks:
+    """Acquire the locks in order and release them in reverse order."""
+    __slots__ = ('locks',)
+
+    def __init__(self, locks: Iterable[threading.RLock], /):
+        self.locks = tuple(locks)
+
+    def __enter__(self) -> None:
+        for lock in self.locks:
+            lock.acquire()
+
+    def __exit__(self, *exc) -> None:
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+def new_locks(stripes: int, /) -> Tuple[threading.RLock, ...]:
+    if stripes < 1:
+        raise ValueError(f'stripes must be at least 1, not {stripes}.')
+    return tuple(threading.RLock() for _ in range(stripes))
+
+
+def stripe_of(name: Hashable, stripes: int, /) -> int:
+    # The same stripe for a key and its deep key form (e.g. 1 and "1").
+    return hash(name if name.__class__ is str else str(name)) % stripes
+
+
+class MemoGqylpyDict(GqylpyDict):
+    # Switched to by `memoize` (and the inner gdict instances on the paths of
+    # the memoized deep keys), each write bumps the version (`__version__`).
+    # The memoized instance holds the results (`__memo__`), each result is
+    # valid while the versions of the gdict instances on its path are.
+
+    def __bump__(self) -> None:
+        self.__dict__['__version__'] += 1
+
+    def __setitem__(self, name: Hashable, value: Any, /) -> None:
+        GqylpyDict.__setitem__(self, name, value)
+        self.__bump__()
+
+    def __delitem__(self, name: Hashable, /) -> None:
+        dict.__delitem__(self, name)
+        self.__bump__()
+
+    def __ior__(self, other: dict, /) -> 'MemoGqylpyDict':
+        self.update(other)
+        return self
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], dict]:
+        # The versions and the results are not pickled.
+        return dict.__new__, (GqylpyDict,), dict(self)
+
+    def snapshot(self) -> GqylpyDict:
+        # Not copy-on-write, `CowGqylpyDict` would drop the versions.
+        return GqylpyDict(self)
+
+    def update(self, __data__: Optional[dict] = None, /, **data) -> None:
+        GqylpyDict.update(self, __data__, **data)
+        self.__bump__()
+
+    def setdefault(self, name: Hashable, default: Any = None, /) -> Any:
+        if name not in self:
+            self[name] = default
+        return dict.__getitem__(self, name)
+
+    def pop(self, name: Hashable, default: Any = __unique__, /) -> Any:
+        if name not in self:
+            if default is __unique__:
+                raise KeyError(name)
+            return default
+        self.__bump__()
+        return dict.pop(self, name)
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        item = dict.popitem(self)
+        self.__bump__()
+        return item
+
+    def clear(self) -> None:
+        dict.clear(self)
+        self.__bump__()
+
+    def deepget(
+            self,
+            deepkey: str,
+            /,
+            default: Optional[Any]                = None,
+            *,
+            ignore:  Union[Tuple[Any], List[Any]] = ()
+    ) -> Any:
+        value = memo_get(self, deepkey)
+        if value is __miss__:
+            return compile_deepkey(deepkey).get(self, default, ignore=ignore)
+        return default if value is __unique__ or value in ignore else value
+
+    def deepcontain(self, deepkey: str, /) -> bool:
+        value = memo_get(self, deepkey)
+        if value is __miss__:
+            return compile_deepkey(deepkey).contains(self)
+        return value is not __unique__
+
+
+# Returned by `memo_get` if the result cannot be memoized.
+__miss__: Final = object()
+
+# The version of a gdict instance, by its `__dict__`.
+get_version: Callable[[dict], int] = itemgetter('__version__')
+
+
+class DeepGetMemo:
+    """
+    The memoized results of `deepget` of a gdict, by the deep key, the least
+    recently used is evicted. A result is
+        (value or `__unique__`, the `__dict__` of each gdict on the path,
+         their versions, the (list, index, item) of each list on the path)
+    A list has no version, its item is checked to be still the same one.
+    """
+    __slots__ = ('entries', 'maxsize', 'hits', 'misses')
+
+    def __init__(self, maxsize: int, /):
+        self.entries: Dict[str, tuple] = {}
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+
+
+def version_node(data: GqylpyDict, /) -> None:
+    object.__setattr__(data, '__class__', MemoGqylpyDict)
+    object.__setattr__(data, '__version__', 0)
+
+
+def memo_get(data: MemoGqylpyDict, deepkey: str, /) -> Any:
+    """
+    Get the value of the deep key (`__unique__` if it does not exist) by the
+    memoized result if still valid, otherwise walk and memoize it. Return
+    `__miss__` if it cannot be memoized, e.g. a pattern, or a dict without a
+    version on the path (a plain dict, a lazy gdict).
+    """
+    memo: Optional[DeepGetMemo] = data.__dict__.get('__memo__')
+    if memo is None:
+        return __miss__
+    entries: Dict[str, tuple] = memo.entries
+
+    entry: Optional[tuple] = entries.pop(deepkey, None)
+    if entry is not None:
+        value, nodes, versions, items = entry
+        if tuple(map(get_version, nodes)) == versions and (not items or all(
+                get_next_data(x, (None, i, __unique__, None)) is item
+                for x, i, item in items
+        )):
+            entries[deepkey] = entry  # The most recently used.
+            memo.hits += 1
+            return value
+
+    memo.misses += 1
+    compiled: DeepKey = compile_deepkey(deepkey)
+    if compiled.__class__ is DeepPattern:
+        return __miss__
+
+    keys: tuple = compiled.keys
+    reached: list = compiled.walk(data, len(keys))
+    value = reached[-1] if len(reached) > len(keys) else __unique__
+    nodes: list = []
+    items: list = []
+
+    # The layers looked up, the value is not one of them.
+    for n, node in enumerate(reached[:len(keys)]):
+        if node.__class__ is GqylpyDict:
+            version_node(node)
+        if node.__class__ is MemoGqylpyDict:
+            nodes.append(node.__dict__)
+        elif isinstance(node, (list, SparseList)):
+            if keys[n][1] is not __unique__:
+                items.append((
+                    node, keys[n][1],
+                    reached[n + 1] if n + 1 < len(reached) else __unique__
+                ))
+        elif node.__class__ is not FrozenGqylpyDict and \
+                isinstance(node, (dict, BatchRecord)):
+            return __miss__
+
+    if memo.maxsize:
+        entries[deepkey] = (
+            value, tuple(nodes), tuple(map(get_version, nodes)), tuple(items)
+        )
+        if len(entries) > memo.maxsize:
+            del entries[next(iter(entries))]
+    return value
+
+
+class TrackedGqylpyDict(GqylpyDict):
+    # Switched to by `track`, each write records the deep key of the changed
+    # path in the shared `ChangeJournal` (`__journal__`), the deep key of this
+    # instance is `__path__`. The inner gdict instances are switched too, the
+    # first time they are reached, and so are the gdict instances in a list
+    # each time the list is reached (the list is not tracked itself, a gdict
+    # may have been put in it since).
+
+    def __getitem__(self, name: Hashable, /) -> Any:
+        value = dict.__getitem__(self, name)
+        if value.__class__ is not TrackedGqylpyDict or \
+                value.__dict__['__journal__'] is not self.__journal__:
+            if value.__class__ is GqylpyDict or \
+                    value.__class__ is TrackedGqylpyDict or \
+                    value.__class__ is list:
+                track_node(value, self.__journal__, self.__child__(name))
+        return value
+
+    def __child__(self, name: Hashable, /) -> str:
+        # The deep key of the child. A key that is not a str is "[1]" below
+        # the root and "1" at the root, got back by the `alt_key` of the key.
+        if not self.__path__:
+            return name if name.__class__ is str else str(name)
+        if name.__class__ is not str:
+            return f'{self.__path__}[{name}]'
+        return f'{self.__path__}.{name}'
+
+    def __record__(self, name: Hashable, /) -> None:
+        self.__journal__.record(self.__child__(name), name in self)
+
+    def __setitem__(self, name: Hashable, value: Any, /) -> None:
+        self.__record__(name)
+        GqylpyDict.__setitem__(self, name, value)
+
+    def __delitem__(self, name: Hashable, /) -> None:
+        self.__record__(name)
+        dict.__delitem__(self, name)
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[type], dict]:
+        # The tracking is not pickled.
+        return dict.__new__, (GqylpyDict,), dict(self)
+
+    def snapshot(self) -> GqylpyDict:
+        # Not copy-on-write, `CowGqylpyDict` would drop the tracking.
+        return GqylpyDict(self)
+
+    def get(self, name: Hashable, default: Any = None, /) -> Any:
+        return self[name] if name in self else default
+
+    def setdefault(self, name: Hashable, default: Any = None, /) -> Any:
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def pop(self, name: Hashable, default: Any = __unique__, /) -> Any:
+        if name not in self:
+            if default is __unique__:
+                raise KeyError(name)
+            return default
+        value = self[name]
+        del self[name]
+        return value
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        name = next(reversed(self))
+        return name, self.pop(name)
+
+    def clear(self) -> None:
+        for name in self:
+            self.__record__(name)
+        dict.clear(self)
+
+    def values(self):
+        for name in self:
+            self[name]
+        return dict.values(self)
+
+    def items(self):
+        for name in self:
+            self[name]
+        return dict.items(self)
+
+    def update(self, __data__: Optional[dict] = None, /, **data) -> None:
+        other = dict.__new__(GqylpyDict)
+        GqylpyDict.update(other, __data__, **data)
+        for name in other:
+            self.__record__(name)
+        dict.update(self, other)
+
+    def __ior__(self, other: dict, /) -> 'TrackedGqylpyDict':
+        self.update(other)
+        return self
+
+    def deepset(self, deepkey: str, value: Any) -> None:
+        # Record the whole deep key, the lists on the way are not tracked.
+        # Recorded after the set, which raises ValueError for a pattern.
+        existed: bool = self.deepcontain(deepkey)
+        compile_deepkey(deepkey).set(self, value)
+        self.__journal__.record(self.__deepkey__(deepkey), existed)
+
+    def deepsetdefault(self, deepkey: str, default: Any) -> Any:
+        existed: bool = self.deepcontain(deepkey)
+        value = compile_deepkey(deepkey).setdefault(self, default)
+        if not existed:
+            self.__journal__.record(self.__deepkey__(deepkey), False)
+        return value
+
+    def deepset_many(self, __data__: dict, /) -> None:
+        items = tuple(
+            __data__.items() if isinstance(__data__, dict) else __data__
+        )
+        existed: List[bool] = [self.deepcontain(k) for k, _ in items]
+        GqylpyDict.deepset_many(self, items)
+        for (deepkey, _), x in zip(items, existed):
+            self.__journal__.record(self.__deepkey__(deepkey), x)
+
+    def __deepkey__(self, deepkey: str, /) -> str:
+        # The deep key from the root.
+        if not self.__path__:
+            return deepkey
+        if deepkey[:1] == '[':
+            return self.__path__ + deepkey
+        return f'{self.__path__}.{deepkey}'
+
+    setdeep = deepset
+
+
+class ChangeJournal:
+    """
+    The paths changed since `track` (or the last reset of `diff`), each with
+    whether it existed before its first change, in the order of the first
+    change.
+    """
+    __slots__ = ('paths',)
+
+    def __init__(self):
+        self.paths: Dict[str, bool] = {}
+
+    def record(self, path: str, existed: bool) -> None:
+        if path not in self.paths:
+            self.paths[path] = existed
+
+    def diff(self, data: GqylpyDict, /) -> List[dict]:
+        ops: List[dict] = []
+        paths: Dict[str, bool] = self.paths
+
+        for path, existed in paths.items():
+            # Skip the paths in a path that is also changed.
+            if any(
+                path[:i] in paths
+                for i, c in enumerate(path) if c == '.' or c == '['
+            ):
+                continue
+            value = compile_deepkey(path).get(data, __unique__)
+            if value is __unique__:
+                if existed:
+                    ops.append({'op': 'remove', 'path': path})
+            else:
+                ops.append({
+                    'op': 'replace' if existed else 'add', 'path': path,
+                    'value': convert(value)
+                })
+
+        return ops
+
+
+def track_node(data: Any, journal: ChangeJournal, path: str) -> None:
+    stack = [(data, path)]
+    # The lists walked by this call, by id, there may be loops.
+    walked: set = set()
+
+    while stack:
+        data, path = stack.pop()
+        if data.__class__ is list:
+            if id(data) in walked:
+                continue
+            walked.add(id(data))
+            for i, item in enumerate(data):
+                if item.__class__ is GqylpyDict or \
+                        item.__class__ is TrackedGqylpyDict or \
+                        item.__class__ is list:
+                    stack.append((item, f'{path}[{i}]'))
+        else:
+            object.__setattr__(data, '__class__', TrackedGqylpyDict)
+            object.__setattr__(data, '__journal__', journal)
+            object.__setattr__(data, '__path__', path)
+
+
+def apply_patch_op(data: GqylpyDict, op: dict, /) -> None:
+    """
+    Apply a JSON Patch (RFC 6902) operation, the paths are deep keys. Add to
+    a list index inserts (or appends, with index "-" or the length), otherwise
+    "add" and "replace" set like `deepset`.
+    """
+    try:
+        kind, path = op['op'], op['path']
+    except KeyError as e:
+        raise ValueError(f'invalid patch operation {op!r}, no {e}.') from None
+
+    if kind == 'test':
+        if compile_deepkey(path).get(data, __unique__) != op['value']:
+            raise ValueError(f'test failed: {path!r}.')
+    elif kind == 'add':
+        patch_add(data, path, op['value'])
+    elif kind == 'replace':
+        if not compile_deepkey(path).contains(data):
+            raise KeyError(path)
+        patch_set(data, path, op['value'])
+    elif kind == 'remove':
+        patch_remove(data, path)
+    elif kind == 'move':
+        patch_add(data, path, patch_remove(data, op['from']))
+    elif kind == 'copy':
+        value = compile_deepkey(op['from']).get(data, __unique__)
+        if value is __unique__:
+            raise KeyError(op['from'])
+        patch_add(data, path, GqylpyDict(deepcopy(value)))
+    else:
+        raise ValueError(f'unknown patch operation: {kind!r}.')
+
+
+def patch_parent(data: GqylpyDict, path: str) -> Tuple[Any, tuple]:
+    deepkey: DeepKey = compile_deepkey(path)
+    nodes: list = deepkey.walk(data, len(deepkey.keys) - 1)
+    if len(nodes) < len(deepkey.keys):
+        return __unique__, deepkey.keys[-1]
+    return nodes[-1], deepkey.keys[-1]
+
+
+def patch_add(data: GqylpyDict, path: str, value: Any) -> None:
+    parent, (key, index, _, _) = patch_parent(data, path)
+    if isinstance(parent, list) and (key == '-' or index is not __unique__):
+        if key == '-':
+            index = len(parent)
+        if 0 <= index <= len(parent):
+            parent.insert(index, GqylpyDict(value))
+            record_list_change(data, path)
+            return
+    patch_set(data, path, value)
+
+
+def patch_set(data: GqylpyDict, path: str, value: Any) -> None:
+    # Set in the dict the path ends in, if any, so that an int key stays a key
+    # of the dict instead of having it replaced with a list like `deepset`.
+    parent, (key, _, alt_key, _) = patch_parent(data, path)
+    if isinstance(parent, dict):
+        if key not in parent and alt_key in parent:
+            key = alt_key
+        parent[key] = value
+    else:
+        compile_deepkey(path).set(data, value)
+
+
+def patch_remove(data: GqylpyDict, path: str) -> Any:
+    parent, (key, index, alt_key, _) = patch_parent(data, path)
+    if isinstance(parent, list):
+        if index is __unique__ or not -len(parent) <= index < len(parent):
+            raise KeyError(path)
+        record_list_change(data, path)
+        return parent.pop(index)
+    if isinstance(parent, dict):
+        if key not in parent:
+            key = alt_key
+        if key in parent:
+            return parent.pop(key)
+    raise KeyError(path)
+
+
+def record_list_change(data: GqylpyDict, path: str) -> None:
+    # A list is not tracked, record its path instead of the index.
+    journal: Optional[ChangeJournal] = data.__dict__.get('__journal__')
+    if journal is not None:
+        path = path[:path.rindex('[')] if path.endswith(']') else \
+            path[:path.rindex('.')]
+        journal.record(path, True)
+
+
+class BufferPassing(threading.local):
+    # Whether the large bytes are passed out-of-band in this thread, set by
+    # `dumps` with a `buffer_callback`.
+    enabled: bool = False
+
+
+buffer_passing = BufferPassing()
+
+
+def restore_buffers(data: dict, /) -> dict:
+    """
+    Restore the values passed as `pickle.PickleBuffer` by `__reduce_ex__`. The
+    out-of-band buffers are returned as they were passed in (e.g. the
+    `PickleBuffer` or a `memoryview`), the bytes or bytearray they view is
+    used as the value if it is whole, otherwise it is copied.
+    """
+    for name, value in data.items():
+        if value.__class__ in (pickle.PickleBuffer, memoryview):
+            view = memoryview(value)
+            whole = view.obj
+            if (view.readonly and whole.__class__ is bytes or
+                    not view.readonly and whole.__class__ is bytearray) and \
+                    view.c_contiguous and view.nbytes == len(whole):
+                data[name] = whole
+            else:
+                data[name] = bytes(view) if view.readonly else \
+                    bytearray(view)
+    return data
+
+
+def pass_buffers(data: dict, /) -> bool:
+    # Replace the large bytes with `pickle.PickleBuffer`, if any.
+    passed = False
+    for name, value in data.items():
+        if value.__class__ in (bytes, bytearray) and \
+                len(value) >= OUT_OF_BAND_SIZE:
+            data[name] = pickle.PickleBuffer(value)
+            passed = True
+    return passed
+
+
+def cow_copy(data: Any, /) -> Any:
+    if data.__class__ is MappedSpan:
+        data = data.load()
+
+    if isinstance(data, dict):
+        node = dict.__new__(CowGqylpyDict)
+        dict.update(node, data)
+        object.__setattr__(node, '__pending__', set(data))
+        return node
+
+    if isinstance(data, (list, tuple)):
+        return data.__class__(cow_copy(v) for v in data)
+
+    return data
+
+
+def cow_seal(data: GqylpyDict, /) -> None:
+    """
+    Seal the layers of the gdict that will be shared with a snapshot, a list
+    is replaced with a copy instead (a list cannot be sealed). The values that
+    are still pending are skipped (the raw data, the spans, or the layers that
+    are sealed already), so only the layers reached since the last snapshot are
+    walked.
+    """
+    stack: list = [data]
+
+    while stack:
+        node = stack.pop()
+        if node.__class__ is list:
+            items = enumerate(node)
+            pending = ()
+        else:
+            items = dict.items(node)
+            # Kept by the lazy layers when they are sealed.
+            pending = node.__dict__.get('__pending__', ())
+        for name, value in tuple(items):
+            if name in pending:
+                continue
+            if value.__class__ is GqylpyDict or \
+                    value.__class__ is LazyGqylpyDict or \
+                    value.__class__ is CowGqylpyDict or \
+                    value.__class__ is MappedGqylpyDict:
+                stack.append(value)
+                object.__setattr__(value, '__class__', SealedGqylpyDict)
+            elif value.__class__ is list:
+                value = list(value)
+                if node.__class__ is list:
+                    node[name] = value
+                else:
+                    dict.__setitem__(node, name, value)
+                stack.append(value)
+
+
+def cow_restore(data: CowGqylpyDict, /) -> None:
+    # Switch a copy-on-write gdict with no layer shared back to a plain gdict.
+    object.__setattr__(data, '__class__', GqylpyDict)
+    data.__dict__.pop('__pending__', None)
+
+
+def cow_detach(data: CowGqylpyDict, /) -> None:
+    """
+    Copy the layers of the copy-on-write gdict (deeply) that may be shared with
+    other snapshots, and switch it back to a plain gdict, for the modes that
+    need to own all the layers (`track`, `memoize`).
+    """
+    detached: GqylpyDict = convert(data)
+    cow_restore(data)
+    dict.update(data, detached)
+
+
+def lazy_convert(data: Any, /) -> Any:
+    if isinstance(data, GqylpyDict):
+        return data
+
+    if isinstance(data, dict):
+        node = dict.__new__(LazyGqylpyDict)
+        dict.update(node, data)
+        object.__setattr__(node, '__pending__', set(data))
+        return node
+
+    if isinstance(data, (list, tuple)):
+        return data.__class__(lazy_convert(v) for v in data)
+
+    return data
+
+
+def adopt(data: Any, /) -> Any:
+    """
+    Convert the data to gdict in place, iteratively. The lists are kept and
+    their items replaced, each dict is moved into a new gdict and cleared at
+    once (a dict cannot change its class), so only one dict at a time is
+    duplicated instead of the whole data. The gdict instances are kept as
+    they are. The tuples (and other sequence classes) are walked as lists of
+    their items, and created after the walk, see `build_sequences`.
+
+    There is no memo by id (as large as the data): a dict moved keeps the
+    gdict under the key `__unique__` during the walk, so that another reference
+    to it (a shared subtree or a cycle) gets the same gdict, and it is emptied
+    after the walk. The lists walked are recorded by id, they are kept alive by
+    the result.
+    """
+    walked: set = set()
+    # The dicts moved, emptied after the walk.
+    moved: List[dict] = []
+    # The sequences by id: [sequence, list of its items, sequence created].
+    sequences: Dict[int, list] = {}
+    # (target, name, sequence id) of each reference to a sequence.
+    places: List[Tuple[Any, Any, int]] = []
+
+    # The data is walked as the item of a list, it may be replaced too.
+    holder: list = [data]
+    stack: list = [holder]
+
+    while stack:
+        target = stack.pop()
+        if target.__class__ is list:
+            items = enumerate(target)
+            setitem = list.__setitem__
+        else:
+            items = dict.items(target)
+            setitem = dict.__setitem__
+
+        for name, value in items:
+            if not isinstance(value, (dict, list, tuple)):
+                continue
+            if is_sequence(value):
+                if id(value) not in sequences:
+                    sequences[id(value)] = [value, list(value), None]
+                    stack.append(sequences[id(value)][1])
+                places.append((target, name, id(value)))
+                continue
+            child, walk = adopt_container(value, walked, moved)
+            if walk:
+                stack.append(child)
+            if child is not value:
+                # Replacing the value of an existing key during the iteration
+                # is safe, the size of the dict does not change.
+                setitem(target, name, child)
+
+    if sequences:
+        build_sequences(sequences)
+        for target, name, key in places:
+            if isinstance(target, dict):
+                dict.__setitem__(target, name, sequences[key][2])
+            else:
+                target[name] = sequences[key][2]
+
+    for data in moved:
+        data.clear()
+
+    return holder[0]
+
+
+def is_sequence(data: Any, /) -> bool:
+    # A tuple or another sequence class created by `adopt` after its items,
+    # not a list (kept) nor a class converted by `convert` (e.g. MappedList).
+    return data.__class__ is not list and isinstance(data, (list, tuple)) \
+        and data.__class__ not in container_kinds
+
+
+def build_sequences(sequences: Dict[int, list], /) -> None:
+    """
+    Create the sequences of `adopt` from their items adopted, each after the
+    sequences in its items (post-order, iteratively). A sequence whose items
+    are all the same is kept. A cycle through the sequences themselves keeps
+    the original sequence where it closes (as `convert` does).
+    """
+    for entry in sequences.values():
+        stack: list = [entry]
+        while stack:
+            entry = stack[-1]
+            source, items, created = entry
+            if created is None:
+                # In progress, the sequences in its items first.
+                entry[2] = __unique__
+                for item in items:
+                    inner: Optional[list] = sequences.get(id(item))
+                    if inner is not None and inner[0] is item and \
+                            inner[2] is None:
+                        stack.append(inner)
+                continue
+            stack.pop()
+            if created is not __unique__:
+                continue
+            for i, item in enumerate(items):
+                inner = sequences.get(id(item))
+                if inner is not None and inner[0] is item and \
+                        inner[2] is not __unique__:
+                    items[i] = inner[2]
+            entry[2] = source if all(map(is_, items, source)) else \
+                source.__class__(items)
+
+
+def adopt_container(
+        data:   Any,
+        walked: set,
+        moved:  List[dict]
+) -> Tuple[Any, bool]:
+    """
+    Return the container replacing the data, and whether its items have to
+    be walked (a gdict taking over a dict, or a list reached the first time).
+    """
+    if isinstance(data, GqylpyDict):
+        return data, False
+    if data.__class__ is list:
+        if id(data) in walked:
+            return data, False
+        walked.add(id(data))
+        return data, True
+    if isinstance(data, dict):
+        if len(data) == 1 and __unique__ in data:
+            return data[__unique__], False
+        node = dict.__new__(GqylpyDict)
+        dict.update(node, data)
+        data.clear()
+        data[__unique__] = node
+        moved.append(data)
+        return node, True
+    if isinstance(data, (list, tuple)):
+        return convert(data), False
+    return data, False
+
+
+def freeze(data: Any, /) -> Any:
+    """
+    Convert the data to frozen gdict iteratively, the dicts are converted to
+    `FrozenGqylpyDict` and the lists to `FrozenList`, a frozen gdict is kept
+    as is.
+    Each container is frozen only once (memo by id), so the shared subtrees
+    remain shared. A reference cycle cannot be frozen.
+    """
+    if data.__class__ is FrozenGqylpyDict or \
+            not isinstance(data, (dict, list, tuple)):
+        return data
+
+    memo: dict = {id(data): None}
+
+    # frame: [iterator, items, source, name of the child being frozen]
+    stack: list = [[
+        iter(data.items() if isinstance(data, dict) else data), [], data, None
+    ]]
+
+    while True:
+        frame: list = stack[-1]
+        iterator, items, source = frame[0], frame[1], frame[2]
+        is_dict: bool = isinstance(source, dict)
+
+        for item in iterator:
+            value = item[1] if is_dict else item
+            if value.__class__ is FrozenGqylpyDict or \
+                    not isinstance(value, (dict, list, tuple)):
+                items.append(item)
+                continue
+            try:
+                value = memo[id(value)]
+            except KeyError:
+                memo[id(value)] = None
+                frame[3] = item[0] if is_dict else None
+                stack.append([iter(
+                    value.items() if isinstance(value, dict) else value
+                ), [], value, None])
+                break
+            if value is None:
+                raise ValueError('cannot freeze a reference cycle')
+            items.append((item[0], value) if is_dict else value)
+        else:
+            stack.pop()
+            if is_dict:
+                value = dict.__new__(FrozenGqylpyDict)
+                dict.update(value, items)
+            elif isinstance(source, list):
+                value = FrozenList(items)
+            elif all(map(is_, items, source)):
+                value = source
+            else:
+                value = source.__class__(items)
+            memo[id(source)] = value
+
+            if not stack:
+                return value
+            frame = stack[-1]
+            frame[1].append(
+                (frame[3], value) if isinstance(frame[2], dict) else value
+            )
+
+
+def flatten(
+        data:       Any,
+        sep:        str,
+        list_style: str
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield the (deep key, value) of each leaf in order, iteratively with an
+    explicit stack of iterators. The empty dicts and lists are leaves too, so
+    that `unflatten` can restore them. A reference cycle raises ValueError.
+    """
+    if list_style not in ('brackets', 'sep'):
+        raise ValueError(
+            f'list_style must be "brackets" or "sep", not {list_style!r}.'
+        )
+    brackets: bool = list_style == 'brackets'
+
+    # frame: (iterator of (key, value), deep key of the layer, the layer)
+    stack: list = [(iter(data.items()), '', data)]
+    # The ids of the layers being flattened (on the stack).
+    walking: set = {id(data)}
+
+    while stack:
+        iterator, path, layer = stack[-1]
+        for key, value in iterator:
+            if isinstance(layer, dict):
+                key = f'{path}{sep}{key}' if path else str(key)
+            elif brackets:
+                key = f'{path}[{key}]'
+            else:
+                key = f'{path}{sep}{key}' if path else str(key)
+            if isinstance(value, (dict, list, tuple)) and value:
+                if id(value) in walking:
+                    raise ValueError('cannot flatten a reference cycle')
+                walking.add(id(value))
+                stack.append((
+                    iter(value.items() if isinstance(value, dict)
+                         else enumerate(value)), key, value
+                ))
+                break
+            yield key, value
+        else:
+            stack.pop()
+            walking.discard(id(layer))
+
+
+class UnflattenNode(dict):
+    # A layer being built by `unflatten`, told apart from a dict leaf.
+    __slots__ = ()
+
+
+def unflatten(
+        data:       Union[dict, Iterable[Tuple[str, Any]]],
+        sep:        str,
+        list_style: str
+) -> GqylpyDict:
+    """
+    Build the data from the (deep key, value) items in two passes. First the
+    keys are merged into a trie of `UnflattenNode`, one dict lookup per key of
+    each deep key, nothing is walked from the root again. Then the trie is
+    built top-down, a layer of integer keys is a list, each index is set like
+    `deepset` (padded with None, a negative index pads in front). A later
+    deep key overrides an earlier one (like `deepset`).
+    """
+    if list_style == 'brackets':
+        split = re.compile(rf'{re.escape(sep)}|\[').split
+    elif list_style == 'sep':
+        split = re.compile(re.escape(sep)).split
+    else:
+        raise ValueError(
+            f'list_style must be "brackets" or "sep", not {list_style!r}.'
+        )
+    brackets: bool = list_style == 'brackets'
+
+    root = UnflattenNode()
+    # The keys parsed, by the text, the same keys recur in many deep keys.
+    parsed: dict = {}
+
+    for path, value in data.items() if isinstance(data, dict) else data:
+        node = root
+        for key in split(path):
+            try:
+                key = parsed[key]
+            except KeyError:
+                key = parsed[key] = parse_flat_key(key, brackets)
+            child = node.get(key)
+            if child.__class__ is not UnflattenNode:
+                child = node[key] = UnflattenNode()
+            parent, node = node, child
+        parent[key] = value
+
+    result = dict.__new__(GqylpyDict)
+    stack: list = [(root, result)]
+
+    while stack:
+        node, target = stack.pop()
+        setitem: Callable[[Any, Any, Any], Any] = (
+            dict.__setitem__ if isinstance(target, dict) else set_next_data
+        )
+        for key, value in node.items():
+            if value.__class__ is UnflattenNode:
+                layer = new_layer(value)
+                stack.append((value, layer))
+                value = layer
+            elif isinstance(value, (dict, list, tuple)):
+                value = convert(value)
+            setitem(target, key, value)
+
+    return result
+
+
+def parse_flat_key(key: str, brackets: bool, /) -> Union[int, str]:
+    # An index of a list is an integer (negative too), "[0]" in the brackets
+    # style, parsed as the deep keys are.
+    if brackets:
+        if key[-1:] != ']':
+            return key
+        set_key: Union[int, str] = parse_key(key)[3]
+        return set_key if set_key.__class__ is int else key[:-1]
+    alt_key: Any = parse_key(key)[2]
+    return alt_key if alt_key.__class__ is int else key
+
+
+def new_layer(node: UnflattenNode, /) -> Union[GqylpyDict, list]:
+    # A list if all the keys are integers (created as by `deepset` for the
+    # first one, filled by `set_next_data`), else a gdict.
+    if set(map(type, node)) == {int}:
+        return new_next_data(next(iter(node)))
+    return dict.__new__(GqylpyDict)
+
+
+def deepupdate(
+        data:        GqylpyDict,
+        other:       dict,
+        lists:       str,
+        on_conflict: Optional[Callable[[str, Any, Any], Any]]
+) -> None:
+    """
+    Merge `other` into the data, both are walked together once, iteratively
+    with a stack of the pairs of layers. A dict is merged into a dict, a list
+    into a list by `lists`, any other value is set (converted) unless equal,
+    so only the values inserted are converted and the subtrees without a
+    change are not written. A value replaced is a conflict, resolved by
+    `on_conflict(deepkey, old, new)`, which returns the value to set.
+    """
+    if not isinstance(other, dict):
+        raise TypeError(
+            f'updated object must be a "dict", not '
+            f'"{other.__class__.__name__}".'
+        )
+    if lists not in ('replace', 'append', 'by_index'):
+        raise ValueError(
+            'lists must be "replace", "append" or "by_index", '
+            f'not {lists!r}.'
+        )
+    # The deep keys are only built for `on_conflict`.
+    keep_path: bool = on_conflict is not None
+
+    # frame: (layer of the data, layer of other, deep key of the layer)
+    stack: list = [(data, other, '')]
+    # The (layer, layer) pairs merged, by id, there may be loops.
+    merged: set = {(id(data), id(other))}
+
+    while stack:
+        target, source, path = stack.pop()
+        is_dict: bool = isinstance(source, dict)
+
+        for key, new in source.items() if is_dict else enumerate(source):
+            if is_dict:
+                old = target.get(key, __unique__)
+            else:
+                old = target[key] if key < len(target) else __unique__
+
+            if old is __unique__:
+                if is_dict:
+                    set_merged(target, key, new)
+                else:
+                    target.append(convert(new))
+                continue
+            if old is new:
+                continue
+
+            if isinstance(old, dict) and isinstance(new, dict) or \
+                    lists == 'by_index' and \
+                    isinstance(old, (list, SparseList)) and \
+                    isinstance(new, (list, tuple)):
+                if (id(old), id(new)) not in merged:
+                    merged.add((id(old), id(new)))
+                    stack.append((old, new, keep_path and join_deepkey(
+                        path, key, is_dict
+                    )))
+                continue
+            if lists == 'append' and isinstance(old, (list, SparseList)) \
+                    and isinstance(new, (list, tuple)):
+                old.extend(convert(new))
+                continue
+
+            if old == new:
+                continue
+            if keep_path:
+                new = on_conflict(join_deepkey(path, key, is_dict), old, new)
+                if new is old:
+                    continue
+            if is_dict:
+                set_merged(target, key, new)
+            else:
+                target[key] = convert(new)
+
+
+def set_merged(target: GqylpyDict, key: Any, value: Any, /) -> None:
+    # Set a value of `other` in a layer of the data, converted only once, by
+    # the `__setitem__` of the layer (of its mode). A gdict is kept as is by
+    # it, so it is copied by `convert` instead, not shared with `other`.
+    target[key] = convert(value) if isinstance(value, GqylpyDict) else value
+
+
+def join_deepkey(path: str, key: Any, in_dict: bool, /) -> str:
+    if in_dict:
+        return f'{path}.{key}' if path else str(key)
+    return f'{path}[{key}]'
+
+
+class GqylpyRecord:
+    """
+    The base of the record classes generated by `schema`, a record has a slot
+    per field instead of a dict. The fields are read as attributes, or by
+    `__getitem__` and the deep* methods, so the paths are the same as gdict.
+    """
+    __slots__ = ()
+
+    # (name, slot, nested record class or None, whether a list of records)
+    __fields__: Tuple[Tuple[str, Any, Optional[type], bool], ...] = ()
+    __fieldset__: frozenset = frozenset()
+    # The spec of the class, it is generated again from it by `pickle`.
+    __schema__: dict = {}
+
+    def __init__(self, **fields):
+        for name, slot, _, _ in self.__fields__:
+            slot.__set__(self, fields.pop(name, None))
+        if fields:
+            raise TypeError(
+                f'{self.__class__.__name__}() got unexpected fields: '
+                f'{", ".join(map(repr, fields))}'
+            )
+
+    def __getitem__(self, name: str, /) -> Any:
+        if name in self.__fieldset__:
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(
+            slot.__get__(self) == slot.__get__(other)
+            for _, slot, _, _ in self.__fields__
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(
+            f'{name}={slot.__get__(self)!r}'
+            for name, slot, _, _ in self.__fields__
+        )
+        return f'{self.__class__.__name__}({fields})'
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Tuple[str, bytes], tuple]]:
+        # The class is generated, so it is pickled by its name and spec.
+        return load_record, (schema_key(self.__class__), tuple(
+            slot.__get__(self) for _, slot, _, _ in self.__fields__
+        ))
+
+    @classmethod
+    def from_gdict(cls, data: dict, /) -> 'GqylpyRecord':
+        record = object.__new__(cls)
+        get = data.get
+        for name, slot, nested, many in cls.__fields__:
+            value = get(name)
+            if nested is not None:
+                if not many:
+                    if isinstance(value, dict):
+                        value = nested.from_gdict(value)
+                elif isinstance(value, (list, tuple)):
+                    value = [
+                        nested.from_gdict(v) if isinstance(v, dict) else v
+                        for v in value
+                    ]
+            slot.__set__(record, value)
+        return record
+
+    def to_gdict(self) -> GqylpyDict:
+        node = dict.__new__(GqylpyDict)
+        for name, slot, _, _ in self.__fields__:
+            value = slot.__get__(self)
+            if isinstance(value, GqylpyRecord):
+                value = value.to_gdict()
+            elif value.__class__ is list:
+                value = [
+                    v.to_gdict() if isinstance(v, GqylpyRecord) else convert(v)
+                    for v in value
+                ]
+            else:
+                value = convert(value)
+            dict.__setitem__(node, name, value)
+        return node
+
+    def deepget(
+            self,
+            deepkey: str,
+            /,
+            default: Optional[Any]                = None,
+            *,
+            ignore:  Union[Tuple[Any], List[Any]] = ()
+    ) -> Any:
+        return compile_deepkey(deepkey).get(self, default, ignore=ignore)
+
+    def deepcontain(self, deepkey: str, /) -> bool:
+        return compile_deepkey(deepkey).contains(self)
+
+    def deepiter(self, deepkey: str, /) -> Iterator[Any]:
+        return compile_deepkey(deepkey).iterate(self)
+
+
+def schema(spec: dict, /, name: str = 'Record') -> Type[GqylpyRecord]:
+    """
+    Generate a record class from the spec, a dict of the fields. The value of
+    a field is a nested spec (dict) for a nested record, or a list of a nested
+    spec for a list of records, anything else for a plain value (e.g. a type,
+    it is only for reading, the value is not checked).
+    """
+    fields: List[Tuple[str, Optional[type], bool]] = []
+
+    for field, value in spec.items():
+        if not (field.__class__ is str and field.isidentifier()) or \
+                iskeyword(field) or hasattr(GqylpyRecord, field):
+            raise ValueError(f'invalid field name: {field!r}')
+        if isinstance(value, dict):
+            fields.append((field, schema(value, f'{name}.{field}'), False))
+        elif isinstance(value, list) and len(value) == 1 and \
+                isinstance(value[0], dict):
+            fields.append((field, schema(value[0], f'{name}.{field}'), True))
+        else:
+            fields.append((field, None, False))
+
+    cls = type(name, (GqylpyRecord,), {
+        '__slots__':    tuple(spec),
+        '__fieldset__': frozenset(spec),
+        '__schema__':   spec
+    })
+    cls.__fields__ = tuple(
+        (field, cls.__dict__[field], nested, many)
+        for field, nested, many in fields
+    )
+    return cls
+
+
+# The record classes by `schema_key`, so that the records loaded by `pickle`
+# share one class per process.
+schema_classes: Dict[Tuple[str, bytes], Type[GqylpyRecord]] = {}
+
+
+def schema_key(cls: Type[GqylpyRecord], /) -> Tuple[str, bytes]:
+    # The name and the pickled spec, computed the first time it is pickled, a
+    # spec that cannot be pickled (e.g. a lambda) raises here.
+    key: Optional[Tuple[str, bytes]] = cls.__dict__.get('__schema_key__')
+    if key is None:
+        key = cls.__name__, \
+            pickle.dumps(cls.__schema__, pickle.HIGHEST_PROTOCOL)
+        cls.__schema_key__ = key
+        schema_classes.setdefault(key, cls)
+    return key
+
+
+def load_record(key: Tuple[str, bytes], values: tuple, /) -> GqylpyRecord:
+    try:
+        cls: Type[GqylpyRecord] = schema_classes[key]
+    except KeyError:
+        cls = schema_classes[key] = schema(pickle.loads(key[1]), key[0])
+        cls.__schema_key__ = key
+    record = object.__new__(cls)
+    for (_, slot, _, _), value in zip(cls.__fields__, values):
+        slot.__set__(record, value)
+    return record
+
+
+class BatchRecord:
+    """
+    A dict of `batch`, without its own key table. The keys are in the layout
+    (the position of each key), one layout is shared by all the records of the
+    same keys, the values are in a list by position. It is read and written as
+    a gdict (attributes, items, the mapping methods, `deepget`, `deepset`,
+    etc.), and is equal to a dict of the same items, a key added or deleted
+    switches it to another layout. It is a `MutableMapping`, not a `dict`, so
+    `json.dumps` needs `to_gdict()` (or `default=gdict.json_default`).
+    """
+    __slots__ = ('__layout__', '__values__')
+
+    def __init__(self, __data__: Optional[dict] = None, /, **data):
+        if __data__ is not None:
+            data = {**__data__, **data}
+        object.__setattr__(self, '__layout__', batch_layout(tuple(data)))
+        object.__setattr__(self, '__values__', [
+            value if isinstance(value, GqylpyDict) else GqylpyDict(value)
+            for value in data.values()
+        ])
+
+    def __getattr__(self, name: str, /) -> Any:
+        try:
+            return self.__values__[self.__layout__[name]]
+        except KeyError:
+            if name[:2] == '__':
+                # Not a key, e.g. the protocol lookups of `copy` and `pickle`.
+                raise AttributeError(name) from None
+            raise
+
+    def __setattr__(self, name: str, value: Any, /) -> None:
+        self[name] = value
+
+    def __delattr__(self, name: str, /) -> None:
+        del self[name]
+
+    def __getitem__(self, name: Hashable, /) -> Any:
+        return self.__values__[self.__layout__[name]]
+
+    def __setitem__(self, name: Hashable, value: Any, /) -> None:
+        if not isinstance(value, GqylpyDict):
+            value = GqylpyDict(value)
+        try:
+            self.__values__[self.__layout__[name]] = value
+        except KeyError:
+            object.__setattr__(
+                self, '__layout__', batch_layout((*self.__layout__, name))
+            )
+            self.__values__.append(value)
+
+    def __delitem__(self, name: Hashable, /) -> None:
+        index: int = self.__layout__[name]
+        keys = tuple(self.__layout__)
+        object.__setattr__(
+            self, '__layout__', batch_layout(keys[:index] + keys[index + 1:])
+        )
+        del self.__values__[index]
+
+    def __contains__(self, name: Any, /) -> bool:
+        return name in self.__layout__
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.__layout__)
+
+    def __len__(self) -> int:
+        return len(self.__values__)
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is BatchRecord:
+            if self.__layout__ is other.__layout__:
+                return self.__values__ == other.__values__
+            other = dict(other.items())
+        elif not isinstance(other, dict):
+            return NotImplemented
+        return dict(self.items()) == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __reduce__(self) -> Tuple[type, tuple, tuple]:
+        return BatchRecord, (), (tuple(self.__layout__), self.__values__)
+
+    def __setstate__(self, state: Tuple[tuple, list], /) -> None:
+        keys, values = state
+        object.__setattr__(self, '__layout__', batch_layout(keys))
+        object.__setattr__(self, '__values__', values)
+
+    def keys(self):
+        return self.__layout__.keys()
+
+    def values(self) -> List[Any]:
+        return self.__values__[:]
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        return list(zip(self.__layout__, self.__values__))
+
+    def get(self, name: Hashable, default: Any = None, /) -> Any:
+        index: Optional[int] = self.__layout__.get(name)
+        return default if index is None else self.__values__[index]
+
+    def setdefault(self, name: Hashable, default: Any = None, /) -> Any:
+        if name not in self.__layout__:
+            self[name] = default
+        return self[name]
+
+    def pop(self, name: Hashable, default: Any = __unique__, /) -> Any:
+        if name not in self.__layout__:
+            if default is __unique__:
+                raise KeyError(name)
+            return default
+        value = self[name]
+        del self[name]
+        return value
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        if not self.__values__:
+            raise KeyError('popitem(): dictionary is empty')
+        name: Hashable = next(reversed(self.__layout__))
+        return name, self.pop(name)
+
+    def update(self, __data__: Any = None, /, **data) -> None:
+        if __data__ is not None:
+            data = dict(__data__, **data)
+        for name, value in data.items():
+            self[name] = value
+
+    def clear(self) -> None:
+        object.__setattr__(self, '__layout__', batch_layout(()))
+        object.__setattr__(self, '__values__', [])
+
+    def copy(self) -> 'BatchRecord':
+        copied = object.__new__(BatchRecord)
+        object.__setattr__(copied, '__layout__', self.__layout__)
+        object.__setattr__(copied, '__values__', self.__values__[:])
+        return copied
+
+    __copy__ = copy
+
+    def to_gdict(self) -> GqylpyDict:
+        return convert(self)
+
+    def deepget(
+            self,
+            deepkey: str,
+            /,
+            default: Optional[Any]                = None,
+            *,
+            ignore:  Union[Tuple[Any], List[Any]] = ()
+    ) -> Any:
+        return compile_deepkey(deepkey).get(self, default, ignore=ignore)
+
+    def deepset(self, deepkey: str, value: Any) -> None:
+        compile_deepkey(deepkey).set(self, value)
+
+    def deepsetdefault(self, deepkey: str, default: Any) -> Any:
+        return compile_deepkey(deepkey).setdefault(self, default)
+
+    def deepcontain(self, deepkey: str, /) -> bool:
+        return compile_deepkey(deepkey).contains(self)
+
+    def deepiter(self, deepkey: str, /) -> Iterator[Any]:
+        return compile_deepkey(deepkey).iterate(self)
+
+
+MutableMapping.register(BatchRecord)
+
+
+@lru_cache(maxsize=4096)
+def batch_layout(keys: Tuple[Hashable, ...], /) -> Dict[Hashable, int]:
+    # Interned, the records of the same keys share the layout.
+    return {key: i for i, key in enumerate(keys)}
+
+
+class RecordBatch(list):
+    # The records returned by `batch`.
+    __slots__ = ()
+
+    def to_gdict(self) -> list:
+        return convert(list(self))
+
+
+def batch(records: Iterable[Any], /) -> RecordBatch:
+    """
+    Build a `BatchRecord` from each dict (and each nested dict) of the records,
+    iteratively with an explicit stack as `convert`. The values of a record
+    (or the items of a list) are copied at once, at the exact size, then the
+    containers among them are replaced in place from the stack, so a record
+    costs a list of the values instead of a dict.
+    """
+    result = RecordBatch(records)
+    memo: dict = {}
+    stack: List[list] = [result]
+    get_kind = container_kinds.get
+
+    while stack:
+        values: list = stack.pop()
+        for i, value in enumerate(values):
+            if get_kind(value.__class__) is not SCALAR:
+                values[i] = batch_value(value, memo, stack)
+
+    return result
+
+
+def batch_value(value: Any, memo: dict, stack: List[list], /) -> Any:
+    # The value to set, the values of a new record or list are pushed.
+    kind: Optional[int] = container_kinds.get(value.__class__)
+    if kind is None:
+        kind = container_kind(value.__class__)
+    if kind is SCALAR:
+        return value
+    try:
+        return memo[id(value)]
+    except KeyError:
+        pass
+    if kind is DICT:
+        target = memo[id(value)] = object.__new__(BatchRecord)
+        object.__setattr__(target, '__layout__', batch_layout(tuple(value)))
+        object.__setattr__(target, '__values__', list(value.values()))
+        stack.append(target.__values__)
+    elif kind is LIST:
+        target = memo[id(value)] = list(value)
+        stack.append(target)
+    else:
+        target = convert(value, memo)
+    return target
+
+
+def to_columns(
+        records: Iterable[dict],
+        paths:   Iterable[str],
+        /,
+        dtypes:  Optional[Dict[str, Any]] = None,
+        *,
+        fill:    Any                      = __unique__,
+        numpy:   Optional[bool]           = None
+) -> Dict[str, Any]:
+    """
+    Extract a column for each deep key from the records. The deep keys are
+    merged by the trie and walked column by column, a layer shared by several
+    deep keys is extracted once for all the records (in C, by `map`, unless
+    something is missing). Then each column with a dtype is built in one go,
+    a NumPy array if NumPy is used, otherwise an `array.array` (the dtype is
+    its typecode).
+    """
+    paths = tuple(paths)
+    records = records if isinstance(records, list) else list(records)
+    dtypes = dtypes or {}
+    np = import_numpy(numpy)
+
+    trie: DeepKeyTrie = compile_deepkeys(paths)
+    found: Dict[int, list] = {
+        i: [pattern.get(record) for record in records]
+        for i, pattern in trie.patterns.items()
+    }
+    stack: list = [(trie.root, records)]
+
+    while stack:
+        node, data = stack.pop()
+        for key, child in node.children.items():
+            next_data: list = get_column(data, key)
+            for i in child.ends:
+                found[i] = next_data
+            if child.children:
+                stack.append((child, next_data))
+
+    columns: Dict[str, Any] = {}
+
+    for i, path in enumerate(paths):
+        column: list = found[i]
+        dtype = dtypes.get(path)
+        if __unique__ in column:
+            if isinstance(fill, dict) and path in fill:
+                value = fill[path]
+            elif fill is not __unique__ and not isinstance(fill, dict):
+                value = fill
+            else:
+                value = default_fill(dtype, np)
+            column = [value if v is __unique__ else v for v in column]
+        try:
+            if dtype is None:
+                column = column if column is not found[i] else column[:]
+            elif np is not None:
+                column = np.array(column, dtype=dtype)
+            else:
+                column = array(dtype, column)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise e.__class__(f'column {path!r}: {e}') from None
+        columns[path] = column
+
+    return columns
+
+
+def get_column(data: list, key: tuple, /) -> list:
+    """
+    The next data of each data by the key (see `get_next_data`), `__unique__`
+    if it does not exist. If the data are all dicts (or all lists) they are
+    got by `itemgetter` in C, unless something is missing.
+    """
+    # Not `set(map(type, data))`, the hash of a gdict class is slow.
+    cls: type = data[0].__class__ if data else dict
+    getter = None
+
+    if all(map(is_, map(type, data), repeat(cls))):
+        if issubclass(cls, dict):
+            getter = itemgetter(key[0])
+        elif key[1] is not __unique__ and \
+                issubclass(cls, (list, tuple, SparseList)):
+            getter = itemgetter(key[1])
+
+    if getter is not None:
+        try:
+            return list(map(getter, data))
+        except (KeyError, IndexError):
+            pass
+
+    return [get_next_data(x, key) for x in data]
+
+
+def default_fill(dtype: Any, np: Any, /) -> Any:
+    # The fill value of the missing values, NaN for a float, 0 for a number.
+    if dtype is None:
+        return None
+    if np is not None:
+        kind: str = np.dtype(dtype).kind
+        return float('nan') if kind in 'fc' else 0 if kind in 'iub' else None
+    return float('nan') if dtype in ('f', 'd') else 0
+
+
+def import_numpy(use: Optional[bool], /) -> Any:
+    # Optional, used if installed, unless `use` is False (True requires it).
+    if use is False:
+        return None
+    try:
+        import numpy
+    except ImportError:
+        if use:
+            raise
+        return None
+    return numpy
+
+
+def from_columns(columns: Dict[str, Iterable[Any]], /) -> List[GqylpyDict]:
+    """
+    Build a record for each row of the columns (the reverse of `to_columns`).
+    The deep keys are merged by the trie and set column by column, the layers
+    (gdict) of all the records are created and set in C, by `map`. A deep key
+    with a list layer (e.g. "a[0]"), or under another one, is set by `deepset`
+    record by record.
+    """
+    paths = tuple(columns)
+    values: List[list] = [
+        column.tolist() if hasattr(column, 'tolist') else list(column)
+        for column in columns.values()
+    ]
+    if len({len(column) for column in values}) > 1:
+        raise ValueError('the columns have different lengths.')
+
+    trie: DeepKeyTrie = compile_deepkeys(paths)
+    for pattern in trie.patterns.values():
+        pattern.set(None, None)
+
+    n: int = len(values[0]) if values else 0
+    new, setitem = dict.__new__, dict.__setitem__
+    records: list = list(map(new, repeat(GqylpyDict, n)))
+    rest: List[int] = []
+    stack: list = [(trie.root, records)]
+
+    while stack:
+        node, parents = stack.pop()
+        for key, child in node.children.items():
+            key = key[3]
+            if key.__class__ is not str or child.ends and child.children:
+                rest.extend(trie_ends(child))
+            elif child.children:
+                layers: list = list(map(new, repeat(GqylpyDict, n)))
+                deque(map(setitem, parents, repeat(key), layers), 0)
+                stack.append((child, layers))
+            else:
+                column: list = values[child.ends[-1]]
+                if any(map(isinstance, column, repeat((dict, list, tuple)))):
+                    column = list(map(convert, column))
+                deque(map(setitem, parents, repeat(key), column), 0)
+
+    for i in sorted(rest):
+        deepkey: DeepKey = compile_deepkey(paths[i])
+        for record, value in zip(records, values[i]):
+            deepkey.set(record, value)
+
+    return records
+
+
+def map_records(
+        records:   Iterable[Any],
+        paths:     Optional[Iterable[str]] = None,
+        *,
+        workers:   Optional[int]           = None,
+        chunksize: int                     = 1000
+) -> Iterator[Any]:
+    """
+    Convert the records (or extract the deep keys from them) chunk by chunk
+    in a process pool, and yield the results in order. At most two chunks per
+    worker are in flight, so the records are streamed, not loaded up front.
+    The chunks and the results are sent by pickle (see `__reduce__`).
+    """
+    if paths is not None:
+        paths = tuple(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or chunksize < 1:
+        raise ValueError('workers and chunksize must be greater than 0.')
+
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunksize)), [])
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from map_chunk(chunk, paths)
+        return
+
+    # Imported here, it takes longer than importing this module.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending: deque = deque()
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(map_chunk, chunk, paths))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def map_chunk(chunk: list, paths: Optional[Tuple[str, ...]], /) -> list:
+    """
+    Run in a worker: convert each record of the chunk, a JSON text (str or
+    bytes) is decoded, a blank one is skipped. If there are deep keys, return
+    the list of their values of each record instead of the record.
+    """
+    records: list = []
+    decode = None
+
+    for record in chunk:
+        if isinstance(record, (str, bytes, bytearray)):
+            if not record or record.isspace():
+                continue
+            if decode is None:
+                decode = json.JSONDecoder(object_hook=json_object_hook).decode
+            if record.__class__ is not str:
+                record = record.decode('utf-8')
+            record = decode(record)
+        elif paths is None and not isinstance(record, GqylpyDict):
+            record = convert(record)
+        records.append(record)
+
+    if paths is None:
+        return records
+
+    get = compile_deepkeys(paths).get
+    return [
+        [v if isinstance(v, GqylpyDict) else convert(v) for v in get(record)]
+        for record in records
+    ]
+
+
+def trie_ends(node: 'DeepKeyTrie.Node', /) -> List[int]:
+    # The deep keys (index) ending at or below the node.
+    ends: List[int] = []
+    stack: list = [node]
+    while stack:
+        node = stack.pop()
+        ends.extend(node.ends)
+        stack.extend(node.children.values())
+    return ends
+
+
+def json_object_hook(data: dict, /) -> GqylpyDict:
+    # Called by the JSON decoder for each object, innermost first, so the
+    # values are already converted.
+    node = dict.__new__(GqylpyDict)
+    dict.update(node, data)
+    return node
+
+
+def read_ndjson(
+        file: Union[str, bytes, os.PathLike, IO],
+        /,
+        **kw
+) -> Iterator[Any]:
+    if isinstance(file, (str, bytes, os.PathLike)):
+        with open(file, encoding='utf-8') as f:
+            yield from read_ndjson(f, **kw)
+        return
+
+    decode = json.JSONDecoder(object_hook=json_object_hook, **kw).decode
+
+    for line in file:
+        if line.__class__ is not str:
+            line = line.decode('utf-8')
+        if line and not line.isspace():
+            yield decode(line)
+
+
+def open_mapped(path: Union[str, bytes, os.PathLike], /) -> Any:
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return json.loads(b'')
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return MappedDocument(mm).open()
+
+
+class MappedDocument:
+    """
+    A memory-mapped JSON document and the index of its brackets (those outside
+    the strings), a container is decoded one layer at a time, the nested
+    containers in it are left as `MappedSpan` instances until they are reached.
+
+    The index holds the offset after each bracket and the depth after it, the
+    depths are kept as bytes (2 per bracket), so the closing bracket of a
+    container and its nested containers are found by `bytes.find`.
+    """
+    __slots__ = ('mm', 'ends', 'depths')
+
+    # The text up to and including the next bracket outside the strings.
+    bracket = re.compile(
+        rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*[\[\]{}]'
+    )
+    # Or the rest of the text if there is no such bracket (e.g. the chunk ends
+    # in a string), so that `findall` never skips to a position in a string.
+    brackets = re.compile(bracket.pattern + rb'|[\s\S]+')
+    chunk_size: int = 1 << 22
+    depth_delta: Final = {ord('['): 1, ord('{'): 1, ord(']'): -1, ord('}'): -1}
+    decode = json.JSONDecoder(object_pairs_hook=list).decode
+
+    def __init__(self, mm: mmap.mmap, /):
+        self.mm = mm
+        self.ends, self.depths = self.index(mm)
+
+    @classmethod
+    def index(cls, mm: mmap.mmap, /) -> Tuple[array, bytes]:
+        size: int = len(mm)
+        ends = array('I' if size < 1 << 32 else 'q')
+        depths = array('H')
+        findall, fullmatch = cls.brackets.findall, cls.bracket.fullmatch
+        delta, last = cls.depth_delta.__getitem__, itemgetter(-1)
+        start = stop = depth = 0
+
+        # Per bracket, all the steps run in C level.
+        while start < size:
+            stop = min(max(stop, start + cls.chunk_size), size)
+            chunks: list = findall(mm, start, stop)
+            if chunks and not fullmatch(chunks[-1]):
+                chunks.pop()
+            if not chunks:
+                if stop == size:
+                    break
+                stop += stop - start  # A string longer than the chunk.
+                continue
+            offsets = array(
+                ends.typecode, accumulate(map(len, chunks), initial=start)
+            )
+            start = offsets[-1]
+            ends.extend(offsets[1:])
+            try:
+                level = array('H', accumulate(
+                    map(delta, map(last, chunks)), initial=depth
+                ))
+            except OverflowError:
+                raise ValueError(
+                    'unbalanced brackets or nested too deeply (65535 layers) '
+                    f'before offset {start}'
+                ) from None
+            depth = level[-1]
+            depths.extend(level[1:])
+
+        if depth:
+            raise ValueError(f'unbalanced brackets, {depth} not closed')
+        return ends, depths.tobytes()
+
+    def find(self, depth: int, start: int, stop: int = None) -> int:
+        # The index of the first bracket after which the depth is `depth`.
+        pattern: bytes = array('H', (depth,)).tobytes()
+        stop = len(self.depths) if stop is None else stop * 2
+        i: int = self.depths.find(pattern, start * 2, stop)
+        while i != -1 and i & 1:
+            i = self.depths.find(pattern, i + 1, stop)
+        return -1 if i == -1 else i >> 1
+
+    def open(self) -> Any:
+        mm, ends = self.mm, self.ends
+        if not ends or mm[:ends[0]].strip() not in (b'{', b'['):
+            return json.loads(mm[:])
+        end: int = self.find(0, 0)
+        if mm[ends[end]:].strip():
+            return json.loads(mm[:])  # Raise the error of the extra data.
+        return self.load(0)
+
+    def layer(self, k: int, /) -> Tuple[Any, List[int]]:
+        # Decode the container of the bracket `k` without the nested
+        # containers, which are decoded as `[]` and returned as indexes.
+        mm, ends, find = self.mm, self.ends, self.find
+        depth = int.from_bytes(self.depths[k * 2:k * 2 + 2], sys.byteorder)
+        end: int = find(depth - 1, k + 1)
+
+        children: List[int] = []
+        pieces: List[bytes] = []
+        start: int = ends[k] - 1
+        i: int = find(depth + 1, k + 1, end)
+        while i != -1:
+            children.append(i)
+            pieces.append(mm[start:ends[i] - 1])
+            pieces.append(b'[]')
+            close: int = find(depth, i + 1, end)
+            start = ends[close]
+            i = find(depth + 1, close + 1, end)
+        pieces.append(mm[start:ends[end]])
+
+        try:
+            value = self.decode(b''.join(pieces).decode('utf-8'))
+        except ValueError as e:
+            raise ValueError(
+                f'invalid JSON in the container at offset {ends[k] - 1}: {e}'
+            ) from None
+        return value, children
+
+    def load(self, k: int, /) -> Any:
+        value, children = self.layer(k)
+
+        if self.mm[self.ends[k] - 1] == ord('{'):
+            node = dict.__new__(MappedGqylpyDict)
+            pending = set()
+            children = iter(children)
+            for name, item in value:
+                if item.__class__ is list:
+                    item = MappedSpan(self, next(children))
+                    pending.add(name)
+                dict.__setitem__(node, name, item)
+            object.__setattr__(node, '__pending__', pending)
+            return node
+
+        children = iter(children)
+        for i, item in enumerate(value):
+            if item.__class__ is list:
+                value[i] = MappedSpan(self, next(children))
+        return MappedList(value)
+
+
+class MappedList(list):
+    # An array of a `MappedDocument`, the nested containers are `MappedSpan`
+    # instances until they are reached by index or by iteration.
+    __slots__ = ()
+
+    def __getitem__(self, index: Union[int, slice], /) -> Any:
+        if index.__class__ is slice:
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = list.__getitem__(self, index)
+        if value.__class__ is MappedSpan:
+            value = value.load()
+            list.__setitem__(self, index, value)
+        return value
+
+    def __iter__(self) -> Iterator[Any]:
+        i = 0
+        while i < len(self):
+            yield self[i]
+            i += 1
+
+    def __reversed__(self) -> Iterator[Any]:
+        for i in range(len(self) - 1, -1, -1):
+            yield self[i]
+
+    def __reduce_ex__(self, protocol: int, /) -> Tuple[type, Tuple[list]]:
+        return list, (self.copy(),)
+
+    def copy(self) -> list:
+        return list(self)
+
+    def pop(self, index: int = -1, /) -> Any:
+        value = list.pop(self, index)
+        return value.load() if value.__class__ is MappedSpan else value
+
+
+class MappedSpan:
+    """
+    A container of a `MappedDocument` that is not decoded yet, it is decoded
+    when reached through the gdict. If it is read in C level (e.g. by `==`),
+    it is decoded each time without being cached.
+    """
+    __slots__ = ('document', 'index')
+
+    def __init__(self, document: MappedDocument, index: int, /):
+        self.document = document
+        self.index = index
+
+    def __repr__(self) -> str:
+        return repr(self.load())
+
+    def __eq__(self, other: Any) -> bool:
+        return self.load() == other
+
+    __hash__ = None
+
+    def load(self) -> Any:
+        return self.document.load(self.index)
+
+
+class SharedList(MappedList):
+    # An array of a `SharedDocument`, read-only.
+    __slots__ = ()
+
+    def __readonly__(self, *a, **kw) -> NoReturn:
+        raise TypeError('shared list is read-only')
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = extend = \
+        insert = remove = pop = clear = sort = reverse = __readonly__
+
+
+class SharedDocument(MappedDocument):
+    """
+    A JSON document and its bracket index in a shared memory segment, written
+    once by `share` and attached by `attach` in any number of processes. Each
+    process decodes only the layers it reaches, the text and the index are
+    read in place (through memoryviews), they are not copied per process.
+
+    The segment: the header, the text (UTF-8), the offsets after the brackets
+    and the depths after them (as in `MappedDocument`), each part aligned to 8
+    bytes.
+    """
+    __slots__ = ('segment',)
+
+    # magic, size of the text, number of brackets, typecode of the offsets
+    header = struct.Struct('<8sQQc7x')
+    magic: Final = b'gdict\x00\x00\x01'
+
+    def __init__(self, segment: Any, /):
+        # The views are released before the segment is closed (by `__del__`),
+        # a segment with the exported views cannot be closed.
+        self.segment = segment
+        magic, size, count, typecode = self.header.unpack_from(segment.buf)
+        if magic != self.magic:
+            raise ValueError(
+                f'shared memory {segment.name!r} is not a shared gdict.'
+            )
+        typecode: str = typecode.decode()
+        start: int = self.header.size
+        offset: int = align(start + size)
+        depths: int = align(offset + count * array(typecode).itemsize)
+        self.mm = segment.buf[start:start + size]
+        self.ends = segment.buf[offset:depths].cast(typecode)
+        self.depths = segment.buf[depths:depths + count * 2]
+
+    def __del__(self):
+        for name in 'mm', 'ends', 'depths':
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+
+    @classmethod
+    def write(cls, text: bytes, /, name: Optional[str] = None) -> Any:
+        from multiprocessing.shared_memory import SharedMemory
+        ends, depths = cls.index(text)
+        start: int = cls.header.size
+        offset: int = align(start + len(text))
+        stop: int = align(offset + len(ends) * ends.itemsize)
+
+        segment = SharedMemory(name, create=True, size=stop + len(depths))
+        buf: memoryview = segment.buf
+        cls.header.pack_into(
+            buf, 0, cls.magic, len(text), len(ends), ends.typecode.encode()
+        )
+        buf[start:start + len(text)] = text
+        buf[offset:offset + len(ends) * ends.itemsize] = ends.tobytes()
+        buf[stop:stop + len(depths)] = depths
+        del buf
+        return segment
+
+    def find(self, depth: int, start: int, stop: int = None) -> int:
+        # As `MappedDocument.find`, a memoryview has no `find`.
+        search = depth_search(depth)
+        stop = len(self.depths) if stop is None else stop * 2
+        found = search(self.depths, start * 2, stop)
+        while found is not None and found.start() & 1:
+            found = search(self.depths, found.start() + 1, stop)
+        return -1 if found is None else found.start() >> 1
+
+    def load(self, k: int, /) -> Any:
+        value = MappedDocument.load(self, k)
+        object.__setattr__(
+            value, '__class__',
+            SharedList if value.__class__ is MappedList else SharedGqylpyDict
+        )
+        return value
+
+
+def align(offset: int, /) -> int:
+    return offset + 7 & ~7
+
+
+@lru_cache(maxsize=None)
+def depth_search(depth: int, /) -> Callable:
+    return re.compile(re.escape(array('H', (depth,)).tobytes())).search
+
+
+def share(data: dict, name: Optional[str] = None, /) -> Any:
+    """
+    Write the data (JSON) to a new shared memory segment, return the
+    `SharedMemory`, attach it by its name. The data is copied, the later
+    changes are not shared. The creator owns the segment, it is removed by
+    `unlink` (or when the creator exits).
+    """
+    if not isinstance(data, dict):
+        raise TypeError(
+            f'shared object must be a "dict", not "{data.__class__.__name__}".'
+        )
+    text: bytes = json.dumps(
+        data, ensure_ascii=False, separators=(',', ':'), default=json_default
+    ).encode('utf-8')
+    return SharedDocument.write(text, name)
+
+
+def json_default(value: Any, /) -> Any:
+    # The `default` of `json.dumps` for the containers that are neither a dict
+    # nor a list, their items are encoded by `json.dumps` as usual.
+    if value.__class__ is SparseList:
+        return list(value)
+    if value.__class__ is BatchRecord:
+        return dict(value.items())
+    if isinstance(value, GqylpyRecord):
+        return value.to_gdict()
+    raise TypeError(
+        f'Object of type {value.__class__.__name__} is not JSON serializable'
+    )
+
+
+def attach(name: str, /) -> SharedGqylpyDict:
+    from multiprocessing.shared_memory import SharedMemory
+    if sys.version_info >= (3, 13):
+        segment = SharedMemory(name, track=False)
+    elif os.name == 'posix':
+        from multiprocessing import resource_tracker
+        # A process without a resource tracker (e.g. spawned) starts its own
+        # one by attaching, which would remove the segment when this process
+        # exits. A forked process shares the tracker of the creator.
+        # The private attribute may be missing in other versions, then it is
+        # unregistered too, a segment removed under the other processes is
+        # worse than one left to the creator to remove.
+        unregister: bool = getattr(
+            resource_tracker._resource_tracker, '_fd', None
+        ) is None
+        segment = SharedMemory(name)
+        if unregister:
+            resource_tracker.unregister(segment._name, 'shared_memory')
+    else:
+        segment = SharedMemory(name)
+    return SharedDocument(segment).load(0)
+
+
+class DeepKey:
+    """
+    A parsed deep key, the string parsing is done once here, so that the
+    repeated access with the same deep key does no parsing.
+    """
+    __slots__ = ('deepkey', 'keys')
+
+    def __init__(self, deepkey: str, /):
+        self.deepkey = deepkey
+        self.keys: Tuple[Tuple[str, Any, Any, Union[int, str]], ...] = \
+            tuple(parse_key(key) for key in split_deepkey(deepkey))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.deepkey!r})'
+
+    def get(
+            self,
+            data:    Any,
+            default: Optional[Any]                = None,
+            *,
+            ignore:  Union[Tuple[Any], List[Any]] = ()
+    ) -> Any:
+        value = data
+
+        for key, index, alt_key, _ in self.keys:
+            if isinstance(value, (list, tuple, SparseList)):
+                if index is __unique__:
+                    return default
+                key = index
+            try:
+                value = value[key]
+            except KeyError:
+                if alt_key is __unique__:
+                    return default
+                try:
+                    value = value[alt_key]
+                except (KeyError, IndexError):
+                    return default
+            except (IndexError, TypeError):
+                return default
+
+        return default if value in ignore else value
+
+    def set(self, data: Any, value: Any) -> None:
+        self.insert(self.walk(data, len(self.keys) - 1), value)
+
+    def setdefault(self, data: Any, default: Any) -> Any:
+        nodes: list = self.walk(data, len(self.keys))
+        if len(nodes) > len(self.keys):
+            return nodes[-1]
+        self.insert(nodes, default)
+        return default
+
+    def walk(self, data: Any, stop: int) -> list:
+        """
+        Walk down from `data` along the first `stop` keys in a single pass,
+        return the data of each layer reached, starting with `data` itself.
+        """
+        nodes: list = [data]
+
+        for key, index, alt_key, _ in self.keys[:stop]:
+            if isinstance(data, (list, tuple, SparseList)):
+                if index is __unique__:
+                    break
+                key = index
+            try:
+                data = data[key]
+            except KeyError:
+                if alt_key is __unique__:
+                    break
+                try:
+                    data = data[alt_key]
+                except (KeyError, IndexError):
+                    break
+            except (IndexError, TypeError):
+                break
+            nodes.append(data)
+
+        return nodes
+
+    def insert(self, nodes: list, value: Any) -> None:
+        """
+        Set the value by the result of `walk`, the layers that do not exist
+        (or whose type does not match the next key) are created on the way.
+        """
+        keys: tuple = self.keys
+        n: int = len(nodes) - 1
+        data = nodes[n]
+
+        if n:
+            data = fit_next_data(
+                data, nodes[n - 1], keys[n - 1][3], n, keys[n][3]
+            )
+
+        for n in range(n, len(keys) - 1):
+            next_data = new_next_data(keys[n + 1][3])
+            data = set_next_data(data, keys[n][3], next_data)
+
+        set_next_data(data, keys[-1][3], value)
+
+    def contains(self, data: Any) -> bool:
+        return self.get(data, __unique__) is not __unique__
+
+    def iterate(self, data: Any) -> Iterator[Any]:
+        value = self.get(data, __unique__)
+        if value is not __unique__:
+            yield value
+
+
+split_deepkey = re.compile(r'[.\[]').split
+
+
+def parse_key(key: str, /) -> Tuple[str, Any, Any, Union[int, str]]:
+    """
+    Parse a key of the deep key to (key, index, alt_key, set_key):
+        key:     The key used to get from a dict.
+        index:   The key used to get from a list or tuple.
+        alt_key: Try to get with it from a dict if the `key` does not exist.
+        set_key: The key used to set, it is an int only if the key in "[]".
+    """
+    set_key: Union[int, str] = key
+
+    if key[-1:] == ']':
+        key = key[:-1]
+        try:
+            set_key = int(key)
+        except ValueError:
+            pass
+
+    try:
+        index = int(key)
+    except ValueError:
+        index = __unique__
+
+    if key.isdigit() or key[:1] == '-' and key[1:].isdigit():
+        alt_key = index
+    else:
+        alt_key = {
+            'None': None, 'True': True, 'False': False, 'Ellipsis': ...
+        }.get(key, __unique__)
+
+    return key, index, alt_key, set_key
+
+
+class DeepPattern(DeepKey):
+    """
+    A deep key with the pattern keys, it matches any number of values:
+        [*]     Each item of a list, each value of a dict.
+        [i:j:k] The items of a list in the slice.
+        ..key   The `key` (or any of the keys above) of the data and of each
+                layer below it, at any depth.
+    The values are matched in a single traversal, in the order of the data.
+    """
+    __slots__ = ('steps',)
+
+    def __init__(self, deepkey: str, /):
+        DeepKey.__init__(self, deepkey)
+        # (descend, kind, key) of each key, the kind is "key", "*" or "slice".
+        self.steps: List[Tuple[bool, str, Any]] = []
+
+        keys = split_deepkey(deepkey[1:] if deepkey[:2] == '..' else deepkey)
+        descend = False
+
+        for i, key in enumerate(keys):
+            if not key and i < len(keys) - 1:
+                descend = True
+                continue
+            if key == '*]':
+                step = descend, '*', None
+            elif match_slice(key):
+                step = descend, 'slice', slice(*(
+                    int(x) if x else None for x in key[:-1].split(':')
+                ))
+            else:
+                step = descend, 'key', parse_key(key)
+            self.steps.append(step)
+            descend = False
+
+    def get(
+            self,
+            data:    Any,
+            default: Optional[Any]                = None,
+            *,
+            ignore:  Union[Tuple[Any], List[Any]] = ()
+    ) -> list:
+        # The `default` is not used, no match is an empty list.
+        return [value for value in self.iterate(data) if value not in ignore]
+
+    def contains(self, data: Any) -> bool:
+        return next(self.iterate(data), __unique__) is not __unique__
+
+    def iterate(self, data: Any) -> Iterator[Any]:
+        steps: list = self.steps
+        stop: int = len(steps)
+        # The layers already descended into, by (step, id), there may be loops.
+        visited: set = set()
+        stack: list = [(0, data)]
+
+        while stack:
+            n, data = stack.pop()
+            if n == stop:
+                yield data
+                continue
+
+            descend, kind, key = steps[n]
+            values: Iterable[Any] = match_step(data, kind, key)
+
+            if descend:
+                if (n, id(data)) in visited:
+                    continue
+                visited.add((n, id(data)))
+                if isinstance(data, (dict, BatchRecord)):
+                    layers = data.values()
+                elif isinstance(data, (list, tuple, SparseList)):
+                    layers = data
+                else:
+                    layers = ()
+                stack.extend(
+                    (n, layer) for layer in reversed(tuple(layers))
+                    if isinstance(
+                        layer, (dict, list, tuple, SparseList, BatchRecord)
+                    )
+                )
+
+            if n + 1 == stop:
+                yield from values
+            else:
+                stack.extend(
+                    (n + 1, value) for value in reversed(tuple(values))
+                )
+
+    def __unsettable__(self, *a, **kw) -> NoReturn:
+        raise ValueError(f'cannot set by the pattern {self.deepkey!r}.')
+
+    set = setdefault = walk = insert = __unsettable__
+
+
+match_slice = re.compile(r'-?\d*:-?\d*(:-?\d*)?]').fullmatch
+
+is_pattern = re.compile(r'\.\.|\[\*]|\[-?\d*:').search
+
+
+def match_step(data: Any, kind: str, key: Any) -> Iterable[Any]:
+    if kind == 'key':
+        value = get_next_data(data, key)
+        return () if value is __unique__ else (value,)
+    if isinstance(data, (list, tuple, SparseList)):
+        return data if kind == '*' else data[key]
+    if kind == '*' and isinstance(data, (dict, BatchRecord)):
+        return data.values()
+    return ()
+
+
+def new_deepkey(deepkey: str, /) -> DeepKey:
+    return (DeepPattern if is_pattern(deepkey) else DeepKey)(deepkey)
+
+
+compile_deepkey = lru_cache(maxsize=2048)(new_deepkey)
+
+
+class DeepKeyTrie:
+    """
+    Multiple deep keys merged by their common prefix, each layer shared by
+    several deep keys is walked only once.
+    """
+    __slots__ = ('deepkeys', 'root', 'paths', 'patterns')
+
+    class Node:
+        __slots__ = ('key', 'children', 'ends')
+
+        def __init__(self, key: tuple):
+            self.key      = key
+            self.children = {}
+            self.ends     = []
+
+    def __init__(self, deepkeys: Tuple[str, ...], /):
+        self.deepkeys = deepkeys
+        self.root = root = DeepKeyTrie.Node(())
+        self.paths: List[List[DeepKeyTrie.Node]] = []
+
+        # The patterns, by the index, they are not merged.
+        self.patterns: Dict[int, DeepPattern] = {}
+
+        for i, deepkey in enumerate(deepkeys):
+            node, path = root, []
+            compiled: DeepKey = compile_deepkey(deepkey)
+            if isinstance(compiled, DeepPattern):
+                self.patterns[i] = compiled
+                self.paths.append(path)
+                continue
+            for key in compiled.keys:
+                try:
+                    node = node.children[key]
+                except KeyError:
+                    child = node.children[key] = DeepKeyTrie.Node(key)
+                    node = child
+                path.append(node)
+            node.ends.append(i)
+            self.paths.append(path)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.deepkeys!r})'
+
+    def walk(self, data: Any, /) -> List[Tuple['DeepKeyTrie.Node', Any]]:
+        """Return the (node, data) of each node reached that ends a key."""
+        reached: list = []
+        stack: list = [(self.root, data)]
+
+        while stack:
+            node, data = stack.pop()
+            for (key, index, alt_key, _), child in node.children.items():
+                if isinstance(data, (list, tuple, SparseList)):
+                    if index is __unique__:
+                        continue
+                    key = index
+                try:
+                    value = data[key]
+                except KeyError:
+                    if alt_key is __unique__:
+                        continue
+                    try:
+                        value = data[alt_key]
+                    except (KeyError, IndexError):
+                        continue
+                except (IndexError, TypeError):
+                    continue
+                if child.ends:
+                    reached.append((child, value))
+                if child.children:
+                    stack.append((child, value))
+
+        return reached
+
+    def get(
+            self,
+            data:    Any,
+            default: Optional[Any]                = None,
+            *,
+            ignore:  Union[Tuple[Any], List[Any]] = ()
+    ) -> list:
+        values = [default] * len(self.deepkeys)
+        for node, value in self.walk(data):
+            if value not in ignore:
+                for i in node.ends:
+                    values[i] = value
+        for i, pattern in self.patterns.items():
+            values[i] = pattern.get(data, ignore=ignore)
+        return values
+
+    def contains(self, data: Any) -> List[bool]:
+        values = [False] * len(self.deepkeys)
+        for node, _ in self.walk(data):
+            for i in node.ends:
+                values[i] = True
+        for i, pattern in self.patterns.items():
+            values[i] = pattern.contains(data)
+        return values
+
+    def set(self, data: Any, values: Union[Tuple[Any], List[Any]]) -> None:
+        """
+        Set the values (one-to-one with the deep keys) in order, each one has
+        the same result as `deepset`. The data of each layer reached is cached
+        by the trie node, then a layer shared with a preceding deep key is not
+        walked again, unless something below it has been written since.
+        """
+        for pattern in self.patterns.values():
+            pattern.set(data, values)
+        root: DeepKeyTrie.Node = self.root
+        cache: dict = {root: data}
+        below: dict = {}
+
+        for nodes, value in zip(self.paths, values):
+            owners: list = [root]
+            data = cache[root]
+
+            for node in nodes[:-1]:
+                try:
+                    next_data = cache[node]
+                except KeyError:
+                    next_data = get_next_data(data, node.key)
+                    if next_data is __unique__:
+                        break
+                    cache[node] = next_data
+                    below.setdefault(owners[-1], []).append(node)
+                owners.append(node)
+                data = next_data
+
+            n: int = len(owners) - 1
+            if n:
+                next_data = fit_next_data(
+                    data, cache[owners[n - 1]], owners[n].key[3], n,
+                    nodes[n].key[3]
+                )
+                if next_data is not data:
+                    invalidate(cache, below, owners[n - 1])
+                    data = next_data
+
+            for n in range(n, len(nodes) - 1):
+                data = set_next_data(
+                    data, nodes[n].key[3], new_next_data(nodes[n + 1].key[3])
+                )
+            set_next_data(data, nodes[-1].key[3], value)
+            invalidate(cache, below, owners[-1])
+
+
+def invalidate(cache: dict, below: dict, node: DeepKeyTrie.Node) -> None:
+    """
+    Drop the data cached below the trie node, it has been written. The `below`
+    records the cached children of each node.
+    """
+    stack = [node]
+    while stack:
+        for child in below.pop(stack.pop(), ()):
+            if cache.pop(child, __unique__) is not __unique__:
+                stack.append(child)
+
+
+compile_deepkeys = lru_cache(maxsize=256)(DeepKeyTrie)
+
+
+def get_next_data(data: Any, key: tuple) -> Any:
+    key, index, alt_key, _ = key
+    if isinstance(data, (list, tuple, SparseList)):
+        if index is __unique__:
+            return __unique__
+        key = index
+    try:
+        return data[key]
+    except KeyError:
+        if alt_key is __unique__:
+            return __unique__
+        try:
+            return data[alt_key]
+        except (KeyError, IndexError):
+            return __unique__
+    except (IndexError, TypeError):
+        return __unique__
+
+
+def fit_next_data(
+        data:       Any,
+        parent:     Any,
+        parent_key: Union[int, str, None],
+        depth:      int,
+        next_key:   Union[int, str]
+) -> Any:
+    """
+    If the type of `data` does not match the next key (dict for str, list for
+    int), replace it with a new one, except for the top layer.
+    """
+    if depth and (
+            next_key.__class__ is str and
+            not isinstance(data, (dict, BatchRecord))
+                                      or
+            next_key.__class__ is int and
+            data.__class__ not in (list, MappedList, SparseList)
+    ):
+        return set_next_data(parent, parent_key, new_next_data(next_key))
+    return data
+
+
+def new_next_data(next_key: Union[int, str], /) -> Any:
+    # The layer created for the next key.
+    return GqylpyDict() if next_key.__class__ is str else []
+
+
+class SparseList:
+    """
+    A list created by `gdict.sparse`, only the items that are not None are
+    stored (by index), the others read as None, so `deepset` pads it by its
+    size only. It is read as a list by the deep keys, `==` and the converter,
+    `list(x)` is the dense list (`json.dumps` needs `json_default`).
+    """
+    __slots__ = ('stored', 'size')
+
+    def __init__(self, iterable: Iterable[Any] = (), /):
+        self.stored: Dict[int, Any] = {}
+        self.size: int = 0
+        self.extend(iterable)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self.stored.get, range(self.size))
+
+    def __reversed__(self) -> Iterator[Any]:
+        return map(self.stored.get, range(self.size - 1, -1, -1))
+
+    def __contains__(self, value: Any) -> bool:
+        if value is None and len(self.stored) < self.size:
+            return True
+        return value in self.stored.values()
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is SparseList:
+            return self.size == other.size and self.stored == other.stored
+        if isinstance(other, list):
+            return self.size == len(other) and list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getitem__(self, index: Union[int, slice], /) -> Any:
+        if index.__class__ is slice:
+            return [self[i] for i in range(*index.indices(self.size))]
+        return self.stored.get(self.position(index))
+
+    def __setitem__(self, index: int, value: Any, /) -> None:
+        index = self.position(index)
+        if value is None:
+            self.stored.pop(index, None)
+        else:
+            self.stored[index] = value
+
+    def __delitem__(self, index: int, /) -> None:
+        self.pop(index)
+
+    def position(self, index: int, /) -> int:
+        if index.__class__ is not int:
+            raise TypeError(
+                'list indices must be integers or slices, '
+                f'not {index.__class__.__name__}'
+            )
+        position: int = index + self.size if index < 0 else index
+        if not 0 <= position < self.size:
+            raise IndexError('list index out of range')
+        return position
+
+    def shift(self, start: int, offset: int, /) -> None:
+        # Move the items from `start` on by `offset`.
+        self.stored = {
+            i + offset if i >= start else i: value
+            for i, value in self.stored.items()
+        }
+
+    def pad(self, count: int, /) -> None:
+        # Pad with None at the end, only the size is changed.
+        self.size += count
+
+    def append(self, value: Any, /) -> None:
+        if value is not None:
+            self.stored[self.size] = value
+        self.size += 1
+
+    def extend(self, iterable: Iterable[Any], /) -> None:
+        stored, size = self.stored, self.size
+        for value in iterable:
+            if value is not None:
+                stored[size] = value
+            size += 1
+        self.size = size
+
+    def insert(self, index: int, value: Any, /) -> None:
+        index = max(0, min(index + self.size if index < 0 else index,
+                           self.size))
+        self.shift(index, 1)
+        self.size += 1
+        if value is not None:
+            self.stored[index] = value
+
+    def pop(self, index: int = -1, /) -> Any:
+        if not self.size:
+            raise IndexError('pop from empty list')
+        index = self.position(index)
+        value = self.stored.pop(index, None)
+        self.shift(index + 1, -1)
+        self.size -= 1
+        return value
+
+    def clear(self) -> None:
+        self.stored.clear()
+        self.size = 0
+
+    def __copy__(self) -> 'SparseList':
+        copied = SparseList()
+        copied.stored, copied.size = dict(self.stored), self.size
+        return copied
+
+    copy = __copy__
+
+
+def new_sparse(data: SparseList, /) -> SparseList:
+    # An empty sparse list of the same size.
+    sparse = SparseList()
+    sparse.size = data.size
+    return sparse
+
+
+SCALAR, DICT, LIST, SEQUENCE, SPARSE = 0, 1, 2, 3, 4
+
+container_kinds: dict = {
+    MappedList: LIST, SharedList: LIST, SparseList: SPARSE, BatchRecord: DICT,
+    FrozenList: LIST
+}
+
+
+def container_kind(cls: type, /) -> int:
+    """
+    Return how the instances of the class are converted, cached by class:
+        DICT:     Convert to a `GqylpyDict`.
+        LIST:     Convert to a new list, filled in place.
+        SEQUENCE: Convert to an instance of the same class after its items
+                  (other tuple and list classes).
+        SPARSE:   Convert to a new `SparseList`, the items stored are filled
+                  in place (by index, as a dict).
+        SCALAR:   Not converted.
+    """
+    if issubclass(cls, dict):
+        kind = DICT
+    elif cls is list:
+        kind = LIST
+    elif issubclass(cls, (list, tuple)):
+        kind = SEQUENCE
+    else:
+        kind = SCALAR
+    container_kinds[cls] = kind
+    return kind
+
+
+def convert(
+        data: Any,
+        memo: Optional[dict]         = None,
+        *,
+        into: Optional['GqylpyDict'] = None
+) -> Any:
+    """
+    Convert the data to gdict iteratively with an explicit stack, so there is
+    no limit on the depth. Each container is converted only once (memo by id),
+    the shared subtrees are converted to one gdict and the cycles are kept.
+    Only a cycle through a tuple cannot be kept, because a tuple has to be
+    created after its items, it remains the original tuple.
+
+    If `into` is passed, `data` must be a dict, which is converted into it.
+    """
+    if memo is None:
+        memo = {}
+
+    # frame: [kind, iterator, target, source, parent frame, name in parent]
+    if into is not None:
+        result = into
+        stack: list = [[DICT, iter(data.items()), into, data, None, None]]
+    else:
+        kind: Optional[int] = container_kinds.get(data.__class__)
+        if kind is None:
+            kind = container_kind(data.__class__)
+        if kind is SCALAR:
+            return data
+        if kind is DICT:
+            result = dict.__new__(GqylpyDict)
+            stack = [[DICT, iter(data.items()), result, data, None, None]]
+        elif kind is LIST:
+            result = []
+            stack = [[LIST, iter(data), result, data, None, None]]
+        elif kind is SPARSE:
+            result = new_sparse(data)
+            stack = [[DICT, iter(data.stored.items()), result.stored, data,
+                      None, None]]
+        else:
+            result = data
+            stack = [[SEQUENCE, iter(data), [], data, None, None]]
+    memo[id(data)] = result
+
+    get_kind, setitem, new = container_kinds.get, dict.__setitem__, dict.__new__
+
+    while stack:
+        frame: list = stack.pop()
+        kind, iterator, target = frame[0], frame[1], frame[2]
+        name = None
+
+        for value in iterator:
+            if kind is DICT:
+                name, value = value
+
+            value_kind: int = get_kind(value.__class__)
+            if value_kind is None:
+                value_kind = container_kind(value.__class__)
+
+            if value_kind is not SCALAR:
+                try:
+                    value = memo[id(value)]
+                except KeyError:
+                    if value_kind is SEQUENCE:
+                        memo[id(value)] = value
+                        if value.__class__ is tuple:
+                            for item in value:
+                                if get_kind(item.__class__) is not SCALAR:
+                                    break
+                            else:
+                                # A tuple of scalars is immutable, keep it.
+                                if kind is DICT:
+                                    setitem(target, name, value)
+                                else:
+                                    target.append(value)
+                                continue
+                        # Suspend this frame until the sequence is created.
+                        stack.append(frame)
+                        stack.append(
+                            [SEQUENCE, iter(value), [], value, frame, name]
+                        )
+                        break
+                    if value_kind is DICT:
+                        child = filled = new(GqylpyDict)
+                        items = iter(value.items())
+                    elif value_kind is SPARSE:
+                        # Filled as a dict, by the items stored.
+                        child = new_sparse(value)
+                        filled, value_kind = child.stored, DICT
+                        items = iter(value.stored.items())
+                    else:
+                        child = filled = []
+                        items = iter(value)
+                    memo[id(value)] = child
+                    stack.append(
+                        [value_kind, items, filled, value, None, None]
+                    )
+                    value = child
+
+            if kind is DICT:
+                setitem(target, name, value)
+            else:
+                target.append(value)
+        else:
+            if kind is SEQUENCE:
+                value = frame[3]
+                value = memo[id(value)] = value.__class__(target)
+                parent: Optional[list] = frame[4]
+                if parent is None:
+                    result = value
+                elif parent[0] is DICT:
+                    dict.__setitem__(parent[2], frame[5], value)
+                else:
+                    parent[2].append(value)
+
+    return result
+
+
+def set_next_data(
+        data:  Union[dict, list],
+        key:   Union[int, str],
+        value: Any
+) -> Any:
+    try:
+        data[key] = value
+    except IndexError:
+        # Pad with None up to the key in bulk, a sparse list only resizes.
+        if key >= 0:
+            padding: int = key - len(data)
+            if data.__class__ is SparseList:
+                data.pad(padding)
+            else:
+                data.extend(repeat(None, padding))
+            data.append(value)
+        else:
+            # Padded at the end, then the value is inserted in front.
+            padding: int = -key - len(data) - 1
+            if data.__class__ is SparseList:
+                data.pad(padding)
+            else:
+                data.extend(repeat(None, padding))
+            data.insert(0, value)
+    return data[key]
+
+
+# The profiling is opt-in, while it is enabled the profiled functions below
+# replace the normal ones (module globals and class attributes), so there is
+# no cost at all while it is disabled.
+
+profile_counters: dict = {}
+
+# The `cache_info` of `compile_deepkey` at the last sync.
+profile_cache_base: list = [0, 0]
+
+profiling: bool = False
+
+unprofiled_convert = convert
+unprofiled_deepkey_init = DeepKey.__init__
+
+# (class, name, method) of each `deepget` and `deepset` replaced, the ones of
+# the modes that override them too (e.g. `memoize`, `track`, `concurrent`).
+unprofiled_methods: List[Tuple[type, str, Callable]] = [
+    (cls, name, cls.__dict__[name])
+    for cls in (
+        GqylpyDict, MemoGqylpyDict, TrackedGqylpyDict, ConcurrentGqylpyDict,
+        GqylpyRecord, BatchRecord
+    )
+    for name in ('deepget', 'getdeep', 'deepset', 'setdeep')
+    if name in cls.__dict__
+]
+
+
+def profiled_convert(
+        data: Any,
+        memo: Optional[dict]         = None,
+        *,
+        into: Optional['GqylpyDict'] = None
+) -> Any:
+    if memo is None:
+        memo = {}
+    count: int = len(memo)
+    result = unprofiled_convert(data, memo, into=into)
+    if len(memo) > count:
+        profile_counters['conversions'] += 1
+        profile_counters['converted_nodes'] += len(memo) - count
+    return result
+
+
+def profiled_deepget(deepget: Callable, /) -> Callable:
+    # Wrap a `deepget`, a miss is a call whose path is not found.
+    def profiled(
+            self:    Any,
+            deepkey: str,
+            /,
+            default: Optional[Any]                = None,
+            *,
+            ignore:  Union[Tuple[Any], List[Any]] = ()
+    ) -> Any:
+        value = deepget(self, deepkey, __unique__, ignore=ignore)
+        profile_counters['deepget_calls'] += 1
+        if value is __unique__:
+            profile_counters['deepget_misses'] += 1
+            return default
+        return value
+    return profiled
+
+
+def profiled_deepset(deepset: Callable, /) -> Callable:
+    # Wrap a `deepset`, a miss is a call whose path is created (the layers).
+    def profiled(self: Any, deepkey: str, value: Any) -> None:
+        compiled: DeepKey = compile_deepkey(deepkey)
+        nodes: list = compiled.walk(self, len(compiled.keys) - 1)
+        deepset(self, deepkey, value)
+        profile_counters['deepset_calls'] += 1
+        if len(nodes) < len(compiled.keys):
+            profile_counters['deepset_misses'] += 1
+    return profiled
+
+
+def profiled_deepkey_init(self: DeepKey, deepkey: str, /) -> None:
+    start: float = time.perf_counter()
+    unprofiled_deepkey_init(self, deepkey)
+    profile_counters['path_parses'] += 1
+    profile_counters['path_parse_time'] += time.perf_counter() - start
+
+
+def sync_profile_cache() -> None:
+    hits, misses = compile_deepkey.cache_info()[:2]
+    profile_counters['path_cache_hits'] += hits - profile_cache_base[0]
+    profile_counters['path_cache_misses'] += misses - profile_cache_base[1]
+    profile_cache_base[:] = hits, misses
+
+
+def reset_profile() -> None:
+    profile_counters.update(
+        conversions=0, converted_nodes=0,
+        deepget_calls=0, deepget_misses=0, deepset_calls=0, deepset_misses=0,
+        path_parses=0, path_parse_time=0.0,
+        path_cache_hits=0, path_cache_misses=0
+    )
+    profile_cache_base[:] = compile_deepkey.cache_info()[:2]
+
+
+def enable_profiling() -> None:
+    global profiling, convert
+    if profiling:
+        return
+    profiling = True
+    profile_cache_base[:] = compile_deepkey.cache_info()[:2]
+
+    convert = profiled_convert
+    for cls, name, method in unprofiled_methods:
+        setattr(cls, name, (
+            profiled_deepget if name in ('deepget', 'getdeep') else
+            profiled_deepset
+        )(method))
+    DeepKey.__init__ = profiled_deepkey_init
+
+
+def disable_profiling() -> None:
+    global profiling, convert
+    if not profiling:
+        return
+    profiling = False
+    sync_profile_cache()
+
+    convert = unprofiled_convert
+    for cls, name, method in unprofiled_methods:
+        setattr(cls, name, method)
+    DeepKey.__init__ = unprofiled_deepkey_init
+
+
+def profile_stats(*, reset: bool = False) -> dict:
+    if profiling:
+        sync_profile_cache()
+    stats = dict(profile_counters)
+    lookups: int = stats['path_cache_hits'] + stats['path_cache_misses']
+    stats['path_cache_hit_rate'] = \
+        stats['path_cache_hits'] / lookups if lookups else None
+    stats['enabled'] = profiling
+    if reset:
+        reset_profile()
+    return stats
+
+
+@contextmanager
+def profile() -> Iterator[dict]:
+    enabled: bool = profiling
+    enable_profiling()
+    outer: dict = profile_stats(reset=True)
+    stats: dict = {}
+    try:
+        yield stats
+    finally:
+        stats.update(profile_stats(reset=True))
+        for name in profile_counters:
+            profile_counters[name] = outer[name] + stats[name]
+        if not enabled:
+            disable_profiling()
+
+
+reset_profile()
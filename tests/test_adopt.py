@@ -0,0 +1,37 @@
+import gqylpy_dict as gdict
+
+
+def test_adopt_dict_shared_with_tuple():
+    for data in (
+            lambda d: {'a': d, 'b': (d,)},
+            lambda d: {'b': (d,), 'a': d},
+            lambda d: {'b': [(d,)], 'a': ((d,),)}
+    ):
+        d = {'x': 1}
+        x = gdict.adopt(data(d))
+        a = x.a if isinstance(x.a, dict) else x.a[0][0]
+        b = x.b[0] if isinstance(x.b, tuple) else x.b[0][0]
+        assert a == {'x': 1} and a is b
+        assert isinstance(a, gdict)
+        assert a.x == 1
+
+
+def test_adopt_tuple_cycle():
+    d = {'y': 2}
+    d['t'] = (d,)
+    x = gdict.adopt(d)
+    assert x.t[0] is x
+
+
+def test_adopt_keeps_scalar_tuple():
+    t = (1, 2)
+    assert gdict.adopt({'t': t}).t is t
+
+
+def test_inner_dicts_emptied():
+    inner = {'b': 1}
+    x = gdict.adopt({'a': inner, 'c': [inner]})
+    assert inner == {}
+    assert x == {'a': {'b': 1}, 'c': [{'b': 1}]}
+    assert x.a is x.c[0]
+    assert gdict({'z': inner}) == {'z': {}}
@@ -0,0 +1,24 @@
+import pytest
+
+import gqylpy_dict as gdict
+
+CLASS_ONLY = [
+    'loads', 'unflatten', 'concurrent', 'wrap', 'adopt', 'from_json',
+    'iter_ndjson', 'map_records', 'open', 'share', 'attach', 'compile',
+    'sparse', 'json_default', 'to_columns', 'from_columns',
+    'enable_profiling', 'disable_profiling', 'stats', 'profile', 'schema',
+    'batch'
+]
+
+
+@pytest.mark.parametrize('name', CLASS_ONLY)
+def test_class_only_methods_do_not_shadow_keys(name):
+    x = gdict({name: 1})
+    assert getattr(x, name) == 1
+    assert callable(getattr(gdict, name))
+
+
+@pytest.mark.parametrize('name', CLASS_ONLY)
+def test_class_only_methods_missing_key(name):
+    with pytest.raises(KeyError):
+        getattr(gdict(), name)
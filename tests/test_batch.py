@@ -0,0 +1,59 @@
+import json
+from collections.abc import Mapping, MutableMapping
+
+import pytest
+
+import gqylpy_dict as gdict
+
+PAYLOAD = [
+    {'id': 1, 'user': {'name': 'Tom'}, 'items': [{'qty': 2}]},
+    {'id': 2, 'user': {'name': 'Ann'}, 'items': []}
+]
+
+
+def records():
+    return gdict.batch(json.loads(json.dumps(PAYLOAD)))
+
+
+def test_batch_reads():
+    r = records()[0]
+    assert r.user.name == 'Tom'
+    assert r.deepget('items[0].qty') == 2
+    assert r == PAYLOAD[0]
+    assert isinstance(r, MutableMapping) and isinstance(r, Mapping)
+    assert not isinstance(r, dict)
+
+
+def test_batch_mapping_writes():
+    r = records()[0]
+    r.update({'id': 10}, extra={'a': 1})
+    assert r.id == 10 and r.extra.a == 1
+    assert r.setdefault('id', 0) == 10
+    assert r.setdefault('new', {'b': 2}).b == 2
+    assert r.pop('new') == {'b': 2}
+    assert r.pop('new', None) is None
+    with pytest.raises(KeyError):
+        r.pop('new')
+    assert r.popitem() == ('extra', {'a': 1})
+    assert list(r) == ['id', 'user', 'items']
+    r.clear()
+    assert r == {} and len(r) == 0
+
+
+def test_batch_deepset():
+    r = records()[0]
+    user = r.user
+    r.deepset('user.name', 'Bob')
+    assert r.user is user and user.name == 'Bob'
+    r.deepset('user.tags[1]', 'x')
+    assert r.user.tags == [None, 'x']
+    assert r.deepsetdefault('user.name', 'Z') == 'Bob'
+    assert r.deepsetdefault('meta.v', 1) == 1 and r.meta.v == 1
+
+
+def test_batch_json():
+    batch = records()
+    with pytest.raises(TypeError):
+        json.dumps(batch)
+    assert json.loads(json.dumps(batch.to_gdict())) == PAYLOAD
+    assert json.loads(json.dumps(batch[0], default=dict)) == PAYLOAD[0]
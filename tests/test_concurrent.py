@@ -0,0 +1,60 @@
+import pickle
+import threading
+
+import gqylpy_dict as gdict
+
+
+def run_threads(target, count):
+    barrier = threading.Barrier(count)
+
+    def run(t):
+        barrier.wait()
+        target(t)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_no_lost_writes():
+    x = gdict.concurrent()
+    threads, rounds = 8, 2000
+
+    def worker(t):
+        for i in range(rounds):
+            x.deepset(f'r{i}.t{t}.v', i)
+
+    run_threads(worker, threads)
+    assert len(x) == rounds
+    for i in range(rounds):
+        assert x[f'r{i}'] == {f't{t}': {'v': i} for t in range(threads)}
+
+
+def test_single_deepsetdefault_winner():
+    x = gdict.concurrent()
+    threads, rounds = 8, 500
+    winners = [[None] * threads for _ in range(rounds)]
+
+    def worker(t):
+        for i in range(rounds):
+            winners[i][t] = x.deepsetdefault(f'o{i}.owner', t)
+
+    run_threads(worker, threads)
+    for i in range(rounds):
+        assert len(set(winners[i])) == 1
+        assert x[f'o{i}'].owner == winners[i][0]
+
+
+def test_pickle_out_of_band():
+    x = gdict.concurrent({'blob': b'b' * (1 << 20), 'a': {'b': 1}}, stripes=4)
+    buffers = []
+    data = x.dumps(buffer_callback=buffers.append)
+    assert buffers
+    y = gdict.loads(data, buffers=buffers)
+    assert y == x
+    assert y.blob.__class__ is bytes
+    y.deepset('a.c', 2)
+    assert y.a == {'b': 1, 'c': 2}
+    assert pickle.loads(pickle.dumps(x, protocol=5)) == x
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+import gqylpy_dict as gdict
+
+
+def test_deepset_negative_index_padding():
+    x = gdict({'a': [1]})
+    x.deepset('a[-3]', 'V')
+    assert x.a == ['V', 1, None]
+    x = gdict()
+    x.deepset('a[-2]', 'V')
+    assert x.a == ['V', None]
+
+
+def test_deepset_large_index_is_list():
+    x = gdict()
+    x.deepset('l[70000]', 1)
+    assert isinstance(x.l, list)
+    assert x.l[70000] == 1 and x.l[:2] == [None, None]
+    json.dumps(x)
+
+
+def test_deepset_sparse_opt_in():
+    x = gdict(events=gdict.sparse())
+    x.deepset('events[5000000].id', 1)
+    assert len(x.events) == 5000001
+    assert x.events[3] is None and x.events[-1].id == 1
+    assert x.deepget('events[5000000].id') == 1
+
+
+def test_sparse_json():
+    x = gdict(events=gdict.sparse())
+    x.deepset('events[2].id', 1)
+    text = json.dumps(x, default=gdict.json_default)
+    assert json.loads(text) == {'events': [None, None, {'id': 1}]}
+    with pytest.raises(TypeError):
+        json.dumps(gdict(a={1}), default=gdict.json_default)
@@ -0,0 +1,27 @@
+import gqylpy_dict as gdict
+
+
+def set_like_deepset(items):
+    data = gdict()
+    for deepkey, value in items.items():
+        data.deepset(deepkey, value)
+    return data
+
+
+def test_unflatten_roundtrip():
+    x = gdict({'a': [1, {'b': [2, 3]}], 'c': {}, 'd': []})
+    assert gdict.unflatten(dict(x.flatten())) == x
+    assert gdict.unflatten(x.flatten(list_style='sep'), list_style='sep') == x
+
+
+def test_unflatten_negative_index():
+    items = {'a[-3]': 'V', 'b[1]': 'B', 'c[0]': 0, 'c[2].e': 'E'}
+    assert gdict.unflatten(items) == set_like_deepset(items)
+    assert gdict.unflatten({'a.-1': 'V'}, list_style='sep') == {'a': ['V']}
+
+
+def test_unflatten_large_index():
+    items = {'a[100000]': 1}
+    x = gdict.unflatten(items)
+    assert x == set_like_deepset(items)
+    assert len(x.a) == 100001 and x.a[100000] == 1
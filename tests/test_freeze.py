@@ -0,0 +1,48 @@
+import pytest
+
+import gqylpy_dict as gdict
+
+
+def test_equal_to_original():
+    data = {'a': [1, {'b': [2]}], 'c': (3,)}
+    frozen = gdict(data).freeze()
+    assert frozen == data and data == frozen
+    assert frozen == gdict(data)
+    assert not frozen != data
+    assert frozen.a == (1, {'b': (2,)})
+    assert frozen != {'a': [1, {'b': [3]}], 'c': (3,)}
+
+
+def test_immutable():
+    frozen = gdict({'a': {'b': [1]}}).freeze()
+    with pytest.raises(TypeError):
+        frozen.a.b = 2
+    with pytest.raises(TypeError):
+        frozen.deepset('a.c', 1)
+    with pytest.raises(AttributeError):
+        frozen.a.b.append(2)
+
+
+def test_dedup():
+    records = [{'a': [1, 2], 'b': {'c': 1}}, {'a': [1, 2], 'b': {'c': 1}},
+               {'a': [2, 1], 'b': {'c': 1}}]
+    unique = {gdict(r).freeze() for r in records}
+    assert len(unique) == 2
+    assert {'a': [2, 1], 'b': {'c': 1}} in list(unique)
+
+
+def test_hash():
+    x = gdict({'a': [1, {'b': 'B'}]})
+    assert hash(x.freeze()) == hash(gdict(x).freeze())
+    assert hash(x) == -2
+    with pytest.raises(TypeError):
+        hash(gdict({'a': {1}}).freeze())
+
+
+def test_thaw():
+    frozen = gdict({'a': [{'b': [1]}], 't': (1,)}).freeze()
+    x = gdict(frozen)
+    assert x.a.__class__ is list and x.a[0].b.__class__ is list
+    assert x.t.__class__ is tuple
+    x.a[0].b.append(2)
+    assert frozen.a[0].b == [1]
@@ -0,0 +1,81 @@
+import gqylpy_dict as gdict
+
+
+def memoized():
+    x = gdict({'a': {'b': [{'c': 'C'}], 'd': 'D'}, 'e': 'E'}).memoize()
+    assert x.deepget('a.b[0].c') == 'C'
+    assert x.deepget('a.b[0].c') == 'C'
+    assert x.memo_info()['hits'] == 1
+    return x
+
+
+def test_writes():
+    x = memoized()
+    x.a.b[0].c = 'C1'
+    assert x.deepget('a.b[0].c') == 'C1'
+    x.a.b[0]['c'] = 'C2'
+    assert x.deepget('a.b[0].c') == 'C2'
+    x.deepset('a.b[0].c', 'C3')
+    assert x.deepget('a.b[0].c') == 'C3'
+    x.a.b[0].update(c='C4')
+    assert x.deepget('a.b[0].c') == 'C4'
+    x.a.b[0].setdefault('z', 1)
+    assert x.deepget('a.b[0].z') == 1
+
+
+def test_deletes():
+    x = memoized()
+    x.a.b[0].pop('c')
+    assert x.deepget('a.b[0].c') is None
+    x.a.b[0].c = 'C'
+    assert x.deepget('a.b[0].c') == 'C'
+    del x.a.b[0].c
+    assert not x.deepcontain('a.b[0].c')
+    x.a.b[0].c = 'C'
+    x.a.b[0].clear()
+    assert x.deepget('a.b[0].c') is None
+    x.a.b[0].c = 'C'
+    x.a.b[0].popitem()
+    assert x.deepget('a.b[0].c') is None
+
+
+def test_ior():
+    x = memoized()
+    x.a.b[0] |= {'c': 'C1'}
+    assert x.deepget('a.b[0].c') == 'C1'
+    x |= {'a': {'b': [{'c': 'C2'}]}}
+    assert x.deepget('a.b[0].c') == 'C2'
+
+
+def test_list_replaced_on_path():
+    x = memoized()
+    x.a.b = [{'c': 'C1'}]
+    assert x.deepget('a.b[0].c') == 'C1'
+    x.a.b[0] = gdict(c='C2')
+    assert x.deepget('a.b[0].c') == 'C2'
+    x.a.b.insert(0, gdict(c='C3'))
+    assert x.deepget('a.b[0].c') == 'C3'
+    x.a = {'b': [{'c': 'C4'}]}
+    assert x.deepget('a.b[0].c') == 'C4'
+
+
+def test_lru_eviction():
+    x = gdict({f'k{i}': {'v': i} for i in range(4)}).memoize(maxsize=2)
+    for i in range(3):
+        assert x.deepget(f'k{i}.v') == i
+    info = x.memo_info()
+    assert info['currsize'] == 2 and info['misses'] == 3
+    assert x.deepget('k2.v') == 2
+    assert x.memo_info()['hits'] == 1
+    assert x.deepget('k0.v') == 0
+    assert x.memo_info()['misses'] == 4
+    x.k0.v = 10
+    assert x.deepget('k0.v') == 10
+
+
+def test_maxsize_zero():
+    x = gdict({'a': {'b': 1}}).memoize(maxsize=0)
+    assert x.deepget('a.b') == 1
+    x.a.b = 2
+    assert x.deepget('a.b') == 2
+    assert x.memo_info()['currsize'] == 0
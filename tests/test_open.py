@@ -0,0 +1,69 @@
+import sys
+import json
+
+import pytest
+
+import gqylpy_dict as gdict
+
+MappedDocument = sys.modules['gqylpy_dict.g dict'].MappedDocument
+
+TRICKY = {
+    'a': 'x]}[{"y',
+    'b': {'c': '\\', 'd': '\\"]'},
+    'e': ['[', {'f': '"{', 'g': [[], {}]}, '}'],
+    'h': 'é中{',
+    'i': [[['deep']]],
+    'j': {}
+}
+
+
+def open_text(tmp_path, text):
+    path = tmp_path / 'doc.json'
+    path.write_text(text, encoding='utf-8')
+    return gdict.open(path)
+
+
+def deep_decode(value):
+    # Reach every layer, so each one goes through `MappedDocument.layer`.
+    if isinstance(value, dict):
+        return {k: deep_decode(value[k]) for k in value}
+    if isinstance(value, list):
+        return [deep_decode(v) for v in value]
+    return value
+
+
+def test_strings_with_brackets_and_quotes(tmp_path):
+    x = open_text(tmp_path, json.dumps(TRICKY, ensure_ascii=False))
+    assert x.a == TRICKY['a']
+    assert x.e[1].f == '"{'
+    assert x.deepget('i[0][0][0]') == 'deep'
+    assert deep_decode(x) == TRICKY
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, 13, 64])
+def test_strings_across_chunks(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(MappedDocument, 'chunk_size', chunk_size)
+    data = dict(TRICKY, long='[{' * 50 + '\\"' * 20 + '}]' * 50)
+    x = open_text(tmp_path, json.dumps(data, indent=1))
+    assert deep_decode(x) == data
+
+
+def test_top_level_array(tmp_path):
+    data = [1, {'a': [2, {'b': '['}]}, [3], 'x']
+    x = open_text(tmp_path, json.dumps(data))
+    assert x[1].a[1].b == '['
+    assert isinstance(x[1], gdict)
+    assert deep_decode(x) == data
+
+
+@pytest.mark.parametrize('text', ['"a[b{"', '42', ' null ', '[]', '{}'])
+def test_scalar_and_empty_documents(tmp_path, text):
+    assert open_text(tmp_path, text) == json.loads(text)
+
+
+@pytest.mark.parametrize('text', [
+    '{"a": 1} x', '{"a": 1}}', '{"a": [1}', '{"a": [1]', '[1] [2]', '"a" 1'
+])
+def test_invalid_documents(tmp_path, text):
+    with pytest.raises(ValueError):
+        deep_decode(open_text(tmp_path, text))
@@ -0,0 +1,79 @@
+import pytest
+
+import gqylpy_dict as gdict
+
+
+def sample():
+    return gdict({
+        'a': [{'b': i} for i in range(5)],
+        'c': {'b': 9, 'd': {'b': 10}}
+    })
+
+
+@pytest.mark.parametrize('deepkey, expected', [
+    ('a[*].b', [0, 1, 2, 3, 4]),
+    ('a[1:3].b', [1, 2]),
+    ('a[-2:].b', [3, 4]),
+    ('a[:-3].b', [0, 1]),
+    ('a[::-1].b', [4, 3, 2, 1, 0]),
+    ('a[-1:-4:-2].b', [4, 2]),
+    ('a[::2].b', [0, 2, 4]),
+    ('a[10:].b', []),
+    ('a[-10:1].b', [0]),
+    ('c[*]', [9, {'b': 10}]),
+    ('c[*].b', [10]),
+    ('c[1:]', []),
+    ('..b', [0, 1, 2, 3, 4, 9, 10]),
+    ('a[*]..b', [0, 1, 2, 3, 4]),
+    ('c..b', [9, 10]),
+    ('..d.b', [10]),
+    ('..zz', []),
+])
+def test_deepget(deepkey, expected):
+    assert sample().deepget(deepkey) == expected
+
+
+def test_deepcontain():
+    x = sample()
+    assert x.deepcontain('a[*].b')
+    assert x.deepcontain('a[-1:].b')
+    assert not x.deepcontain('a[9:].b')
+    assert x.deepcontain('..d')
+    assert not x.deepcontain('..zz')
+    assert not x.deepcontain('c[*].zz')
+
+
+def test_deepiter():
+    values = sample().deepiter('..b')
+    assert next(values) == 0
+    assert list(values) == [1, 2, 3, 4, 9, 10]
+    assert list(sample().deepiter('c.d.b')) == [10]
+    assert list(sample().deepiter('c.zz')) == []
+
+
+def test_recursive_descent_over_cycles():
+    x = gdict({'n': {'b': 1, 'l': []}})
+    dict.__setitem__(x.n, 'self', x)
+    x.n.l.append(x.n)
+    x.n.l.append(gdict(b=2))
+    dict.__setitem__(x.n.l[1], 'up', x)
+    assert x.deepget('..b') == [1, 2]
+    assert x.deepcontain('..up.n.b')
+    assert not x.deepcontain('..zz')
+    assert x.deepget('n.l[*].b') == [1, 2]
+
+
+def test_ignore_and_default():
+    x = sample()
+    assert x.deepget('a[*].b', ignore=[0, 4]) == [1, 2, 3]
+    assert x.deepget('a[10:].b', 'default') == []
+
+
+@pytest.mark.parametrize('deepkey', ['a[*].b', 'a[1:].b', '..b'])
+def test_writes_reject_patterns(deepkey):
+    x = sample()
+    with pytest.raises(ValueError):
+        x.deepset(deepkey, 1)
+    with pytest.raises(ValueError):
+        x.deepsetdefault(deepkey, 1)
+    assert x == sample()
@@ -0,0 +1,82 @@
+import copy
+import pickle
+
+import gqylpy_dict as gdict
+
+DATA = {'a': [{'b': 'B'}, (1, {'c': None})], 'd': {'e': {'f': 1.5}}}
+
+
+def assert_gdict(x):
+    assert x.a[0].b == 'B'
+    assert x.a[1].__class__ is tuple
+    assert x.a[1][1].c is None
+    assert x.d.e.f == 1.5
+
+
+def test_pickle():
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        x = pickle.loads(pickle.dumps(gdict(DATA), protocol))
+        assert x == DATA
+        assert_gdict(x)
+
+
+def test_dumps_loads():
+    x = gdict(DATA)
+    x.s = x.d
+    x.d.loop = x
+    y = gdict.loads(x.dumps())
+    assert_gdict(y)
+    assert y.s is y.d and y.d.loop is y
+
+
+def test_out_of_band():
+    blob, array = b'b' * (1 << 20), bytearray(1 << 17)
+    x = gdict({'blob': blob, 'inner': {'array': array}, 'small': b's'})
+    buffers = []
+    data = x.dumps(buffer_callback=buffers.append)
+    assert len(buffers) == 2 and len(data) < 1 << 16
+    y = gdict.loads(data, buffers=buffers)
+    assert y == x
+    assert y.blob is blob and y.inner.array is array
+    y = gdict.loads(data, buffers=[bytes(b) for b in buffers])
+    assert y.blob == blob and y.inner.array == array
+    y = gdict.loads(x.dumps())
+    assert y.blob == blob and y.inner.array.__class__ is bytearray
+    buffers = []
+    pickle.dumps(x, 5, buffer_callback=buffers.append)
+    assert not buffers
+
+
+def test_lazy():
+    raw = {'a': {'b': {'c': 1}}, 'd': [{'e': 2}]}
+    x = gdict.wrap(raw)
+    x.a
+    y = gdict.loads(x.dumps())
+    assert y == raw
+    assert y.a.b.c == 1 and y.d[0].e == 2
+    assert isinstance(y.d[0], gdict)
+    assert copy.deepcopy(x) == raw
+
+
+def test_frozen():
+    x = gdict(DATA).freeze()
+    y = gdict.loads(x.dumps())
+    assert y == x and hash(y) == hash(x)
+    assert y.__class__.__real_name__ == 'FrozenGqylpyDict'
+    assert y.a[0].__class__.__real_name__ == 'FrozenGqylpyDict'
+
+
+def test_memo():
+    x = gdict(DATA).memoize()
+    assert x.deepget('d.e.f') == 1.5
+    y = gdict.loads(x.dumps())
+    assert y == DATA and y.__class__.__real_name__ == 'GqylpyDict'
+    y.d.e.f = 2
+    assert y.deepget('d.e.f') == 2
+
+
+def test_tracked():
+    x = gdict(DATA).track()
+    x.d.e.f = 2
+    y = pickle.loads(pickle.dumps(x))
+    assert y.d.e.f == 2 and y.d.__class__.__real_name__ == 'GqylpyDict'
@@ -0,0 +1,33 @@
+import pickle
+import subprocess
+import sys
+
+import gqylpy_dict as gdict
+
+SPEC = {'id': int, 'user': {'name': str}, 'items': [{'sku': str}]}
+
+
+def test_pickle_record():
+    Event = gdict.schema(SPEC, name='Event')
+    e = Event.from_gdict(
+        {'id': 1, 'user': {'name': 'Tom'}, 'items': [{'sku': 'a'}]}
+    )
+    loaded = pickle.loads(pickle.dumps(e))
+    assert loaded.__class__ is Event
+    assert loaded == e
+    assert loaded.items[0].sku == 'a'
+
+
+def test_pickle_record_other_process():
+    Event = gdict.schema(SPEC, name='Event')
+    data = pickle.dumps(Event.from_gdict({'id': 1, 'user': {'name': 'Tom'}}))
+    code = (
+        'import sys, pickle, gqylpy_dict\n'
+        'e = pickle.loads(sys.stdin.buffer.read())\n'
+        'print(e.__class__.__name__, e.id, e.user.name)'
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code], input=data, capture_output=True,
+        check=True
+    ).stdout
+    assert out.split() == [b'Event', b'1', b'Tom']
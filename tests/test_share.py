@@ -0,0 +1,69 @@
+import os
+import sys
+import subprocess
+import multiprocessing
+
+import pytest
+
+import gqylpy_dict as gdict
+
+DATA = {'regions': [{'name': 'us-east-1'}, {'name': 'eu-west-1'}], 'n': 2}
+
+
+def read_attached(name, queue):
+    x = gdict.attach(name)
+    queue.put((x.deepget('regions[1].name'), x.n))
+
+
+def test_attach_in_spawned_processes():
+    shm = gdict.share(DATA)
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        queue = ctx.Queue()
+        for _ in range(2):
+            process = ctx.Process(target=read_attached, args=(shm.name, queue))
+            process.start()
+            assert queue.get(timeout=60) == ('eu-west-1', 2)
+            process.join(60)
+            assert process.exitcode == 0
+        # The segment survives the exit of the processes attached to it.
+        assert gdict.attach(shm.name) == DATA
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_attach_in_independent_processes():
+    # Not started by `multiprocessing`, so without the resource tracker of the
+    # creator, e.g. the workers exec'd by a server.
+    shm = gdict.share(DATA)
+    code = (
+        'import sys, gqylpy_dict as gdict; '
+        'print(gdict.attach(sys.argv[1]).deepget("regions[1].name"))'
+    )
+    try:
+        for _ in range(2):
+            result = subprocess.run(
+                [sys.executable, '-c', code, shm.name],
+                capture_output=True, text=True, timeout=60,
+                cwd=os.path.dirname(os.path.dirname(gdict.__file__))
+            )
+            assert result.stdout.strip() == 'eu-west-1', result.stderr
+        assert gdict.attach(shm.name) == DATA
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_attached_is_read_only():
+    shm = gdict.share(DATA)
+    try:
+        x = gdict.attach(shm.name)
+        with pytest.raises(TypeError):
+            x.n = 3
+        y = x.copy()
+        y.n = 3
+        assert x.n == 2
+    finally:
+        shm.close()
+        shm.unlink()
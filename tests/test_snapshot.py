@@ -0,0 +1,60 @@
+import pytest
+
+import gqylpy_dict as gdict
+
+
+def test_snapshot_then_track():
+    base = gdict({'db': {'host': 'localhost', 'port': 3306}})
+    tenant = base.snapshot()
+    base.track()
+    base.db.port = 3307
+    assert base.diff() == [
+        {'op': 'replace', 'path': 'db.port', 'value': 3307}
+    ]
+    assert tenant.db.port == 3306
+
+
+def test_snapshot_then_memoize():
+    base = gdict({'db': {'port': 3306}})
+    tenant = base.snapshot()
+    tenant.memoize()
+    assert tenant.deepget('db.port') == 3306
+    tenant.db.port = 3307
+    assert tenant.deepget('db.port') == 3307
+    assert base.deepget('db.port') == 3306
+    base.memoize()
+    assert base.deepget('db.port') == 3306
+
+
+def test_snapshot_restores_class():
+    base = gdict({'a': {'b': 1}})
+    base.snapshot()
+    base.a
+    assert base.track() is base
+
+
+def test_reference_before_snapshot():
+    src = gdict({'a': {'b': 1, 'c': {'d': 1}}, 'l': [{'x': 1}]})
+    a, c, l = src.a, src.a.c, src.l
+    snap = src.snapshot()
+    with pytest.raises(TypeError):
+        a.b = 2
+    with pytest.raises(TypeError):
+        c.update(d=2)
+    l.append(2)
+    assert snap == src == {'a': {'b': 1, 'c': {'d': 1}}, 'l': [{'x': 1}]}
+    src.a.c.d = 2
+    assert snap.a.c.d == 1
+    assert a == {'b': 1, 'c': {'d': 1}}
+
+
+def test_reference_between_snapshots():
+    src = gdict({'a': {'b': 1}})
+    first = src.snapshot()
+    a = src.a
+    a.b = 2
+    second = src.snapshot()
+    with pytest.raises(TypeError):
+        a.b = 3
+    assert first.a.b == 1
+    assert second.a.b == src.a.b == 2
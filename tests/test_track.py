@@ -0,0 +1,83 @@
+import pytest
+
+import gqylpy_dict as gdict
+
+
+def test_patch_operations():
+    x = gdict({'a': {'b': 1}, 'l': [1, 2]})
+    x.patch([
+        {'op': 'add', 'path': 'c', 'value': 3},
+        {'op': 'add', 'path': 'l[1]', 'value': 9},
+        {'op': 'replace', 'path': 'a.b', 'value': 2},
+        {'op': 'copy', 'from': 'a', 'path': 'd'},
+        {'op': 'move', 'from': 'c', 'path': 'e'},
+        {'op': 'remove', 'path': 'l[0]'},
+        {'op': 'test', 'path': 'd.b', 'value': 2}
+    ])
+    assert x == {'a': {'b': 2}, 'l': [9, 2], 'd': {'b': 2}, 'e': 3}
+    x.d.b = 3
+    assert x.a.b == 2
+
+
+def test_patch_errors():
+    x = gdict({'a': 1})
+    with pytest.raises(ValueError):
+        x.patch([{'op': 'test', 'path': 'a', 'value': 2}])
+    with pytest.raises(KeyError):
+        x.patch([{'op': 'replace', 'path': 'b', 'value': 2}])
+    with pytest.raises(ValueError):
+        x.patch([{'op': 'swap', 'path': 'a'}])
+
+
+def test_diff_patch_replica():
+    x = gdict({'a': {'b': 1}, 'c': 2, 'l': [{'d': 1}]})
+    replica = x.deepcopy()
+    x.track()
+    x.a.b = 2
+    del x.c
+    x.e = 5
+    x.l[0].d = 2
+    ops = x.diff(reset=True)
+    assert ops == [
+        {'op': 'replace', 'path': 'a.b', 'value': 2},
+        {'op': 'remove', 'path': 'c'},
+        {'op': 'add', 'path': 'e', 'value': 5},
+        {'op': 'replace', 'path': 'l[0].d', 'value': 2}
+    ]
+    replica.patch(ops)
+    assert replica == x
+    assert x.diff() == []
+
+
+def test_int_key_paths():
+    x = gdict({1: {'b': 1}, 'a': {2: 1}}).track()
+    x[1].b = 2
+    x.a[2] = 3
+    ops = x.diff()
+    assert ops == [
+        {'op': 'replace', 'path': '1.b', 'value': 2},
+        {'op': 'replace', 'path': 'a[2]', 'value': 3}
+    ]
+    replica = gdict({1: {'b': 1}, 'a': {2: 1}})
+    replica.patch(ops)
+    assert replica == x
+
+
+def test_list_reached_again():
+    x = gdict({'l': [{'a': 1}]}).track()
+    x.l[0].a = 2
+    x.deepset('l[1]', gdict(c=2))
+    x.diff(reset=True)
+    x.l[1].c = 3
+    assert x.diff() == [{'op': 'replace', 'path': 'l[1].c', 'value': 3}]
+
+
+def test_ior():
+    x = gdict({'a': 1}).track()
+    x |= {'a': 2, 'b': {'c': 1}}
+    assert x.diff(reset=True) == [
+        {'op': 'replace', 'path': 'a', 'value': 2},
+        {'op': 'add', 'path': 'b', 'value': {'c': 1}}
+    ]
+    x.b.c = 2
+    assert x.diff() == [{'op': 'replace', 'path': 'b.c', 'value': 2}]
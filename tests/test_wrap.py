@@ -0,0 +1,75 @@
+import json
+
+import gqylpy_dict as gdict
+
+
+def raw():
+    return {'a': [{'b': 'B'}, ({'c': 'C'},)], 'd': {'e': {'f': 1}}, 'g': 1}
+
+
+def test_getattr_getitem():
+    data = raw()
+    x = gdict.wrap(data)
+    assert x.__class__.__real_name__ == 'LazyGqylpyDict'
+    assert x['d'] is not data['d']
+    assert isinstance(x.d, gdict) and isinstance(x.d.e, gdict)
+    assert x.d.e.f == 1
+    assert x.a[0].b == 'B'
+    assert isinstance(x.a[1][0], gdict)
+    assert x.a[1][0].c == 'C'
+    assert x.a[1].__class__ is tuple
+    assert x.d is x.d
+
+
+def test_deepget():
+    x = gdict.wrap(raw())
+    assert x.deepget('a[0].b') == 'B'
+    assert x.deepget('d.e.f') == 1
+    assert x.deepget('a[*].b') == ['B']
+    assert x.deepcontain('a[1][0].c')
+    assert isinstance(x.deepget('d.e'), gdict)
+
+
+def test_equal_to_dict():
+    x = gdict.wrap(raw())
+    assert x == raw() and raw() == x
+    assert isinstance(x, dict) and isinstance(x, gdict)
+    x.d.e.f
+    assert x == raw()
+    assert json.loads(json.dumps(x)) == json.loads(json.dumps(raw()))
+
+
+def test_values_items():
+    x = gdict.wrap(raw())
+    values = list(x.values())
+    assert isinstance(values[1], gdict) and values[1].e.f == 1
+    assert isinstance(values[0][0], gdict)
+    x = gdict.wrap(raw())
+    items = dict(x.items())
+    assert isinstance(items['d'], gdict) and items['d'].e.f == 1
+    assert x.get('d').e.f == 1
+    assert x.get('zz', 0) == 0
+
+
+def test_pop_popitem():
+    x = gdict.wrap(raw())
+    d = x.pop('d')
+    assert isinstance(d, gdict) and d.e.f == 1
+    assert 'd' not in x
+    assert x.pop('zz', None) is None
+    name, value = gdict.wrap({'a': {'b': 1}}).popitem()
+    assert name == 'a' and isinstance(value, gdict) and value.b == 1
+
+
+def test_writes():
+    data = raw()
+    x = gdict.wrap(data)
+    x.g = {'h': 1}
+    assert isinstance(x.g, gdict)
+    x.deepset('d.e.f', 2)
+    assert x.d.e.f == 2
+    x.update(i={'j': 1})
+    assert x.i.j == 1
+    x.setdefault('k', {'l': 1})
+    assert x.k.l == 1
+    assert data['g'] == 1